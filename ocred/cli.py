@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import sys
+import typing
+
+_modes = ["meaningful", "sparse", "cascaded", "invoice"]
+
+
+def _languages(value: str) -> list[str]:
+    return [language.strip() for language in value.split(",") if language.strip()]
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ocred",
+        description="OCR images using a long-lived local OCR worker or in bulk.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser(
+        "serve", help="start an OCR worker that keeps the OCR engines warm"
+    )
+    serve.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="address to listen on; addresses other than loopback ones expose the "
+        "unauthenticated worker to the network",
+    )
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=1,
+        help="maximum number of jobs running at the same time",
+    )
+    serve.add_argument(
+        "--max-queue",
+        type=int,
+        default=64,
+        help="maximum number of jobs waiting for a free slot",
+    )
+    serve.add_argument(
+        "--warm",
+        type=_languages,
+        action="append",
+        help="comma separated easyocr languages to load before serving (repeatable)",
+    )
+    serve.add_argument(
+        "--profile",
+        action="append",
+        help="name of a profile to warm before serving (repeatable)",
+    )
+
+    ocr = subparsers.add_parser("ocr", help="OCR images using a running OCR worker")
+    ocr.add_argument("files", nargs="+")
+    ocr.add_argument("--host", default="127.0.0.1")
+    ocr.add_argument("--port", type=int, default=8765)
+    ocr.add_argument("--mode", choices=_modes, default="meaningful")
+    ocr.add_argument("--profile", help="name of a profile (see ocred.profiles)")
+    ocr.add_argument(
+        "--preprocess", action="store_true", help="preprocess the images first"
+    )
+    ocr.add_argument(
+        "--invoice-info",
+        action="store_true",
+        help="also extract the information from invoices",
+    )
+    ocr.add_argument(
+        "--jobs", type=int, default=1, help="number of images sent at the same time"
+    )
+    ocr.add_argument(
+        "--json", action="store_true", help="print the full results as JSON lines"
+    )
+
+    ingest = subparsers.add_parser(
+        "ingest", help="OCR a directory of images, resuming interrupted runs"
+    )
+    ingest.add_argument("directory")
+    ingest.add_argument("output_directory")
+    ingest.add_argument("--mode", choices=_modes, default="meaningful")
+    ingest.add_argument("--profile", help="name of a profile (see ocred.profiles)")
+    ingest.add_argument(
+        "--preprocess", action="store_true", help="preprocess the images first"
+    )
+    ingest.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    ingest.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=100,
+        help="number of images OCRed between two checkpoints",
+    )
+
+    loadtest = subparsers.add_parser(
+        "loadtest",
+        help="measure the throughput, latency, memory and accuracy on synthetic documents",
+    )
+    loadtest.add_argument(
+        "--mode", choices=["preprocess", *_modes], default="meaningful"
+    )
+    loadtest.add_argument("--kind", choices=["page", "receipt"], default="page")
+    loadtest.add_argument("--documents", type=int, default=10)
+    loadtest.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1],
+        help="numbers of documents processed at the same time (one run each)",
+    )
+    loadtest.add_argument(
+        "--scale",
+        type=float,
+        nargs="+",
+        default=[1.0],
+        help="resolutions of the documents (one run each)",
+    )
+    loadtest.add_argument("--skew", type=float, default=0.0, help="in degrees")
+    loadtest.add_argument("--noise", type=float, default=0.0)
+    loadtest.add_argument("--seed", type=int, default=0)
+    loadtest.add_argument(
+        "--threads",
+        type=int,
+        help="number of threads used by OpenCV, PyTorch and Tesseract (cores to use)",
+    )
+    loadtest.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="number of documents processed before measuring each run",
+    )
+    loadtest.add_argument("--profile", help="name of a profile (see ocred.profiles)")
+    loadtest.add_argument(
+        "--cpu",
+        action="store_true",
+        help="run easyocr on the CPU (sparse, cascaded and invoice modes)",
+    )
+    loadtest.add_argument(
+        "--no-quantize",
+        action="store_true",
+        help="use the float32 easyocr models instead of the int8 ones on the CPU "
+        "(sparse, cascaded and invoice modes)",
+    )
+    loadtest.add_argument(
+        "--json", action="store_true", help="print the full reports as JSON lines"
+    )
+
+    return parser
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from ocred.server import Server
+
+    server = Server(
+        (args.host, args.port),
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        warm_languages=args.warm,
+        warm_profiles=args.profile,
+    )
+    print(
+        f"OCR worker listening on http://{args.host}:{server.server_port}", flush=True
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+def _ocr(args: argparse.Namespace) -> int:
+    from ocred.client import Client
+
+    client = Client(args.host, args.port)
+    options = {} if args.profile is None else {"profile": args.profile}
+
+    def run(path: str) -> tuple[str, dict[str, typing.Any] | None, str | None]:
+        try:
+            result = client.ocr(
+                path,
+                mode=args.mode,
+                preprocess=args.preprocess,
+                invoice_info=args.invoice_info,
+                **options,
+            )
+        except (ValueError, RuntimeError, OSError) as e:
+            return path, None, str(e)
+        return path, result, None
+
+    status = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        for path, result, error in executor.map(run, args.files):
+            if error is not None:
+                print(f"{path}: {error}", file=sys.stderr)
+                status = 1
+                continue
+
+            assert result is not None
+            if args.json:
+                print(json.dumps({"path": path, **result}, ensure_ascii=False))
+            else:
+                print(f"{path}: {result['text'].strip()}")
+
+    return status
+
+
+def _ingest(args: argparse.Namespace) -> int:
+    from ocred.ingest import Ingestor
+
+    ingestor = Ingestor(
+        args.directory,
+        args.output_directory,
+        mode=args.mode,
+        preprocess=args.preprocess,
+        options=None if args.profile is None else {"profile": args.profile},
+        output_format=args.format,
+        checkpoint_every=args.checkpoint_every,
+    )
+    summary = ingestor.run()
+    print(
+        f"processed {summary['processed']}, skipped {summary['skipped']}, "
+        f"failed {summary['failed']}"
+    )
+
+    return 1 if summary["failed"] else 0
+
+
+def _loadtest(args: argparse.Namespace) -> int:
+    from ocred.loadtest import run_load_test
+
+    options: dict[str, typing.Any] = {}
+    if args.profile is not None:
+        options["profile"] = args.profile
+    if args.cpu or args.no_quantize:
+        if args.mode not in ("sparse", "cascaded", "invoice"):
+            print(
+                "--cpu and --no-quantize only apply to the easyocr modes",
+                file=sys.stderr,
+            )
+            return 2
+        options.update(gpu=not args.cpu, quantize=not args.no_quantize)
+
+    status = 0
+    for scale in args.scale:
+        for concurrency in args.concurrency:
+            report = run_load_test(
+                args.mode,
+                n_documents=args.documents,
+                concurrency=concurrency,
+                kind=args.kind,
+                scale=scale,
+                skew=args.skew,
+                noise=args.noise,
+                seed=args.seed,
+                threads=args.threads,
+                warmup=args.warmup,
+                options=options,
+            )
+            if report["errors"]:
+                status = 1
+
+            if args.json:
+                print(json.dumps(report))
+                continue
+
+            summary = f"{report['throughput']:.2f} docs/s"
+            if report["latency"] is not None:
+                summary += (
+                    f", p50 {report['latency']['p50']:.3f}s"
+                    f", p99 {report['latency']['p99']:.3f}s"
+                )
+            if report["peak_rss_mb"] is not None:
+                summary += f", peak RSS {report['peak_rss_mb']:.0f} MB"
+            if report["cer"] is not None:
+                summary += f", CER {report['cer']:.3f}, WER {report['wer']:.3f}"
+            if report["fields"] is not None:
+                summary += ", fields " + ", ".join(
+                    f"{field} {accuracy:.0%}"
+                    for field, accuracy in report["fields"].items()
+                )
+            print(
+                f"scale {scale}, concurrency {concurrency}: {summary}, "
+                f"{len(report['errors'])} errors"
+            )
+
+    return status
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Entry point of the `ocred` command.
+
+    `ocred serve` starts an OCR worker (see `ocred.server.Server`),
+    `ocred ocr file1 file2 ...` forwards the files to a running worker, and
+    `ocred ingest directory output_directory` OCRs a directory of images (see
+    `ocred.ingest.Ingestor`), and `ocred loadtest` measures the speed and accuracy
+    on synthetic documents (see `ocred.loadtest.run_load_test`).
+    """
+    args = _parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "serve":
+        return _serve(args)
+    if args.command == "ingest":
+        return _ingest(args)
+    if args.command == "loadtest":
+        return _loadtest(args)
+    return _ocr(args)
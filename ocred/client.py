@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import os
+import typing
+import urllib.error
+import urllib.request
+
+
+class Client:
+    """
+    A thin client for the OCR worker started using `ocred serve` (see
+    `ocred.server.Server`).
+
+    Args:
+        host:
+            Host of the worker.
+        port:
+            Port of the worker.
+        timeout:
+            Seconds to wait for a response; OCRing large documents can be slow.
+
+    Examples:
+        >>> from ocred.client import Client
+        >>> client = Client("127.0.0.1", 8765)
+        >>> client.url
+        'http://127.0.0.1:8765'
+    """
+
+    def __init__(
+        self,
+        host: str | None = "127.0.0.1",
+        port: int | None = 8765,
+        *,
+        timeout: float | None = 600,
+    ) -> None:
+        self.url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def _request(
+        self, endpoint: str, job: dict[str, typing.Any] | None = None
+    ) -> dict[str, typing.Any]:
+        data = None if job is None else json.dumps(job).encode("utf-8")
+        request = urllib.request.Request(
+            self.url + endpoint,
+            data=data,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read())["error"]
+            except (ValueError, KeyError):
+                message = e.reason
+            if e.code == 400:
+                raise ValueError(message) from None
+            raise RuntimeError(f"OCR worker failed with {e.code}: {message}") from None
+
+    def health(self) -> dict[str, typing.Any]:
+        """Returns the health of the worker."""
+        return self._request("/health")
+
+    def metrics(self) -> dict[str, typing.Any]:
+        """Returns the metrics of the worker."""
+        return self._request("/metrics")
+
+    def ocr(
+        self,
+        path: str,
+        *,
+        mode: str | None = "meaningful",
+        preprocess: bool | None = False,
+        invoice_info: bool | None = False,
+        **options: typing.Any,
+    ) -> dict[str, typing.Any]:
+        """
+        OCRs an image using the worker.
+
+        Args:
+            path:
+                Path of the image; it is sent as an absolute path, so the worker must
+                be able to read it.
+            mode:
+                "meaningful", "sparse", "cascaded" or "invoice".
+            preprocess:
+                Preprocess the image before OCRing it (see `OCR`).
+            invoice_info:
+                Also extract the information from an invoice.
+            options:
+                Keyword arguments passed down to the OCR method of the mode.
+
+        Returns:
+            result:
+                A dictionary with the extracted "text", the "details" returned by the
+                OCR method (if any), and the "invoice_info" (if asked for).
+        """
+        return self._request(
+            "/ocr",
+            {
+                "path": os.path.abspath(path),
+                "mode": mode,
+                "preprocess": preprocess,
+                "invoice_info": invoice_info,
+                "options": options,
+            },
+        )
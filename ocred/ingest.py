@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import typing
+
+from ocred.server import _to_builtin, run_job
+
+logger = logging.getLogger(__name__)
+
+_extensions = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Ingestor:
+    """
+    OCRs every image in a directory (recursively), writing the results in bulk to
+    JSONL or Parquet shards.
+
+    A manifest (`manifest.json` in the output directory) records the path, mtime,
+    size and SHA-256 hash of every processed image. Images that did not change since
+    they were processed are skipped, so an interrupted run can simply be started
+    again to resume it. The manifest and a new shard are written after every
+    `checkpoint_every` images, and when the run is interrupted.
+
+    Shards are never rewritten, so the record of a modified image is written to a new
+    shard while its outdated record stays in an old one. The manifest points to the
+    shard with the current record of every image; use `read_records` to read only
+    the current records. Images deleted from the directory are dropped from the
+    manifest once a run walks the whole directory, and their records are no longer
+    read.
+
+    Args:
+        directory:
+            Directory with the images.
+        output_directory:
+            Directory where the manifest and the shards are written.
+        mode:
+            "meaningful", "sparse", "cascaded" or "invoice" (see `ocred.server.run_job`).
+        preprocess:
+            Preprocess the images before OCRing them (see `OCR`).
+        options:
+            Keyword arguments passed down to the OCR method of the mode.
+        output_format:
+            "jsonl" or "parquet" (requires `pyarrow`).
+        checkpoint_every:
+            Number of images OCRed between two checkpoints (and records per shard).
+
+    Examples:
+        >>> import tempfile
+        >>> from ocred.ingest import Ingestor
+        >>> ingestor = Ingestor("images", tempfile.mkdtemp(), mode="sparse")
+        >>> len(ingestor.files())
+        7
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        output_directory: str,
+        *,
+        mode: str | None = "meaningful",
+        preprocess: bool | None = False,
+        options: dict[str, typing.Any] | None = None,
+        output_format: str | None = "jsonl",
+        checkpoint_every: int = 100,
+    ) -> None:
+        if output_format not in ("jsonl", "parquet"):
+            raise ValueError(
+                f"output_format must be jsonl or parquet; got {output_format!r}"
+            )
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+
+        self.directory = directory
+        self.output_directory = output_directory
+        self.mode = mode
+        self.preprocess = preprocess
+        self.options = options or {}
+        self.output_format = output_format
+        self.checkpoint_every = checkpoint_every
+
+        self.manifest_path = os.path.join(output_directory, "manifest.json")
+        os.makedirs(output_directory, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest: dict[str, typing.Any] = json.load(f)
+        else:
+            self.manifest = {"shards": 0, "files": {}}
+
+        self._records: list[dict[str, typing.Any]] = []
+
+    def files(self) -> list[str]:
+        """Returns the paths (relative to `directory`) of all images, sorted."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.lower().endswith(_extensions):
+                    path = os.path.join(root, name)
+                    files.append(os.path.relpath(path, self.directory))
+        return sorted(files)
+
+    def _changed_digest(self, relpath: str, stat: os.stat_result) -> str | None:
+        """Returns the SHA-256 hash of a new or modified image, and None otherwise."""
+        path = os.path.join(self.directory, relpath)
+        entry = self.manifest["files"].get(relpath)
+        if entry is None or entry["status"] != "ok":
+            return _sha256(path)
+        if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return None
+
+        # touched but maybe not modified; compare the contents
+        digest = _sha256(path)
+        if entry["size"] == stat.st_size and entry["sha256"] == digest:
+            entry["mtime"] = stat.st_mtime
+            return None
+        return digest
+
+    def run(self) -> dict[str, int]:
+        """
+        OCRs all new or modified images.
+
+        Returns:
+            summary:
+                The number of "processed", "skipped" and "failed" images.
+        """
+        summary = {"processed": 0, "skipped": 0, "failed": 0}
+        pending = 0
+        seen = set()
+
+        try:
+            for relpath in self.files():
+                path = os.path.join(self.directory, relpath)
+                try:
+                    stat = os.stat(path)
+                    digest = self._changed_digest(relpath, stat)
+                except OSError as e:  # deleted (or unreadable) during the walk
+                    logger.warning("skipping %s: %s", path, e)
+                    summary["skipped"] += 1
+                    continue
+                seen.add(relpath)
+                if digest is None:
+                    summary["skipped"] += 1
+                    continue
+
+                entry = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest}
+                try:
+                    result = run_job(
+                        {
+                            "path": path,
+                            "mode": self.mode,
+                            "preprocess": self.preprocess,
+                            "options": self.options,
+                        }
+                    )
+                except Exception as e:
+                    logger.warning("failed to OCR %s: %s", path, e)
+                    entry.update({"status": "failed", "error": str(e)})
+                    summary["failed"] += 1
+                else:
+                    entry["status"] = "ok"
+                    self._records.append(
+                        {
+                            "path": relpath,
+                            "sha256": entry["sha256"],
+                            "mode": self.mode,
+                            "text": result["text"],
+                            "details": result["details"],
+                            "script": result.get("script"),
+                        }
+                    )
+                    summary["processed"] += 1
+
+                self.manifest["files"][relpath] = entry
+                pending += 1
+                if pending >= self.checkpoint_every:
+                    self.checkpoint()
+                    pending = 0
+
+            # forgetting the deleted images, only once the whole directory was walked
+            for relpath in sorted(set(self.manifest["files"]) - seen):
+                logger.info("dropping %s from the manifest; it was deleted", relpath)
+                del self.manifest["files"][relpath]
+        finally:
+            self.checkpoint()
+
+        return summary
+
+    def checkpoint(self) -> None:
+        """Writes the buffered records to a new shard, and then the manifest."""
+        if self._records:
+            shard = f"shard-{self.manifest['shards']:05d}.{self.output_format}"
+            self._write_shard(os.path.join(self.output_directory, shard))
+            for record in self._records:
+                self.manifest["files"][record["path"]]["shard"] = shard
+            self.manifest["shards"] += 1
+            self._records = []
+
+        # replacing the manifest atomically, so that a crash never corrupts it
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.manifest_path)
+
+    def _write_shard(self, path: str) -> None:
+        tmp = path + ".tmp"
+        if self.output_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist(
+                [
+                    {
+                        **record,
+                        "details": json.dumps(
+                            record["details"], default=_to_builtin, ensure_ascii=False
+                        ),
+                    }
+                    for record in self._records
+                ]
+            )
+            pq.write_table(table, tmp)
+        else:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(
+                    json.dumps(record, default=_to_builtin, ensure_ascii=False) + "\n"
+                    for record in self._records
+                )
+        os.replace(tmp, path)
+
+
+def read_records(output_directory: str) -> typing.Iterator[dict[str, typing.Any]]:
+    """
+    Reads the current records written by `Ingestor`, skipping the outdated records of
+    images that were modified and OCRed again.
+
+    Args:
+        output_directory:
+            Directory with the manifest and the shards.
+
+    Returns:
+        records:
+            The records, one per image, shard by shard.
+    """
+    with open(os.path.join(output_directory, "manifest.json"), encoding="utf-8") as f:
+        files = json.load(f)["files"]
+
+    for shard in sorted(
+        {entry["shard"] for entry in files.values() if "shard" in entry}
+    ):
+        path = os.path.join(output_directory, shard)
+        if shard.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            records = pq.read_table(path).to_pylist()
+            for record in records:
+                record["details"] = json.loads(record["details"])
+        else:
+            with open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+
+        for record in records:
+            entry = files.get(record["path"], {})
+            if entry.get("shard") == shard and entry.get("sha256") == record["sha256"]:
+                yield record
@@ -0,0 +1,542 @@
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import typing
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+from scipy import ndimage
+
+from ocred.ocr import _preprocess_image
+from ocred.server import run_job
+
+logger = logging.getLogger(__name__)
+
+_words = (
+    "the of and to in is that for it as was with be by on not he this are or his "
+    "from at which but have an they you were her she there been one all we their "
+    "has would when if so no what up out about who into them some could him than "
+    "time only new other more these two may first then do any like my now over such "
+    "our man me even most made after also did many before must through back years "
+    "where much your way well down should because each just those people how too "
+    "little state good very make world still own see men work long get here between "
+    "both life being under never day same another know while last might us great "
+    "old year off come since against go came right used take three page book light"
+).split()
+
+_shops = ["Cosmos Cafe", "Green Grocer", "City Pharmacy", "Spice Kitchen"]
+_items = ["Tea", "Coffee", "Sandwich", "Noodles", "Juice", "Salad", "Rice", "Bread"]
+
+_modes = ["preprocess", "meaningful", "sparse", "cascaded", "invoice"]
+
+
+def _render_lines(
+    lines: list[str],
+    width: int,
+    *,
+    scale: float,
+    skew: float,
+    noise: float,
+    rng: random.Random,
+) -> npt.NDArray[np.uint8]:
+    """Renders lines of text on a white page, then skews it and adds noise."""
+    line_height = int(40 * scale)
+    margin = int(40 * scale)
+    height = 2 * margin + line_height * len(lines)
+
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(
+            img,
+            line,
+            (margin, margin + line_height * (i + 1) - line_height // 4),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            scale,
+            (0, 0, 0),
+            max(1, round(2 * scale)),
+            cv2.LINE_AA,
+        )
+
+    if skew:
+        img = ndimage.rotate(img, skew, reshape=True, cval=255)
+    if noise:
+        noise_rng = np.random.default_rng(rng.randrange(2**32))
+        noisy = img + noise_rng.normal(0, noise, img.shape)
+        img = np.clip(noisy, 0, 255).astype(np.uint8)
+
+    return img
+
+
+def synthesize_page(
+    *,
+    n_words: int = 150,
+    scale: float = 1.0,
+    skew: float = 0.0,
+    noise: float = 0.0,
+    seed: int = 0,
+) -> tuple[npt.NDArray[np.uint8], str]:
+    """
+    Synthesizes a page of a book with a known ground truth.
+
+    Args:
+        n_words:
+            Number of words on the page.
+        scale:
+            Resolution of the page; 1.0 is roughly an A4 page scanned at 150 DPI.
+        skew:
+            Angle (in degrees) by which the page is rotated.
+        noise:
+            Standard deviation of the Gaussian noise added to the page.
+        seed:
+            Seed of the random words and noise.
+
+    Returns:
+        img:
+            The page.
+        text:
+            The text on the page.
+
+    Examples:
+        >>> from ocred.loadtest import synthesize_page
+        >>> img, text = synthesize_page(n_words=20, skew=2, noise=10)
+        >>> len(text.split())
+        20
+    """
+    rng = random.Random(seed)
+    width = int(1240 * scale)
+    words = [rng.choice(_words) for _ in range(n_words)]
+
+    # wrapping the words to the width of the page
+    max_chars = max(1, int((width - 80 * scale) / (20 * scale)))
+    lines: list[str] = []
+    for word in words:
+        if lines and len(lines[-1]) + 1 + len(word) <= max_chars:
+            lines[-1] += " " + word
+        else:
+            lines.append(word)
+
+    img = _render_lines(lines, width, scale=scale, skew=skew, noise=noise, rng=rng)
+    return img, " ".join(words)
+
+
+def synthesize_receipt(
+    *,
+    n_items: int = 5,
+    scale: float = 1.0,
+    skew: float = 0.0,
+    noise: float = 0.0,
+    seed: int = 0,
+) -> tuple[npt.NDArray[np.uint8], str, dict[str, typing.Any]]:
+    """
+    Synthesizes a receipt (with a place, date, phone number, order number, items and
+    a total) with a known ground truth.
+
+    Args:
+        n_items:
+            Number of items on the receipt.
+        scale:
+            Resolution of the receipt.
+        skew:
+            Angle (in degrees) by which the receipt is rotated.
+        noise:
+            Standard deviation of the Gaussian noise added to the receipt.
+        seed:
+            Seed of the random contents and noise.
+
+    Returns:
+        img:
+            The receipt.
+        text:
+            The text on the receipt.
+        fields:
+            The "place", "date", "phone_number", "order_number" and "price" (the
+            total) on the receipt, as `OCR.process_extracted_text_from_invoice`
+            should extract them.
+
+    Examples:
+        >>> from ocred.loadtest import synthesize_receipt
+        >>> img, text, fields = synthesize_receipt(n_items=3)
+        >>> text.split()[-2]
+        'Rs'
+        >>> fields["price"] == float(text.split()[-1])
+        True
+    """
+    rng = random.Random(seed)
+
+    items = [
+        (rng.choice(_items), rng.randint(1, 5), rng.randint(20, 300))
+        for _ in range(n_items)
+    ]
+    total = sum(quantity * price for _, quantity, price in items)
+    fields: dict[str, typing.Any] = {
+        "place": rng.choice(_shops),
+        "date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2015, 2023)}",
+        "phone_number": f"{rng.randint(6, 9)}{rng.randint(0, 999999999):09d}",
+        "order_number": str(rng.randint(1000, 99999)),
+        "price": float(total),
+    }
+    lines: list[str] = [
+        fields["place"],
+        f"Date {fields['date']}",
+        f"Phone {fields['phone_number']}",
+        f"Order No {fields['order_number']}",
+        *[f"{name} {quantity} x {price}.00" for name, quantity, price in items],
+        f"Total Rs {total}.00",
+    ]
+
+    img = _render_lines(
+        lines, int(600 * scale), scale=scale, skew=skew, noise=noise, rng=rng
+    )
+    return img, " ".join(lines), fields
+
+
+def _edit_distance(
+    reference: typing.Sequence[str], hypothesis: typing.Sequence[str]
+) -> int:
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp))
+            )
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Returns the Character Error Rate - the edit distance between the characters of the
+    (whitespace normalized) texts, divided by the number of reference characters.
+
+    Examples:
+        >>> from ocred.loadtest import character_error_rate
+        >>> character_error_rate("hello world", "helo  world")
+        0.09090909090909091
+    """
+    reference, hypothesis = " ".join(reference.split()), " ".join(hypothesis.split())
+    return _edit_distance(reference, hypothesis) / max(1, len(reference))
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Returns the Word Error Rate - the edit distance between the words of the texts,
+    divided by the number of reference words.
+
+    Examples:
+        >>> from ocred.loadtest import word_error_rate
+        >>> word_error_rate("hello big world", "hello world")
+        0.3333333333333333
+    """
+    reference_words = reference.split()
+    return _edit_distance(reference_words, hypothesis.split()) / max(
+        1, len(reference_words)
+    )
+
+
+def _rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/statm", encoding="utf-8") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _children(pid: int) -> list[int]:
+    """Returns the child processes of a process, listed by each of its threads."""
+    children: list[int] = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children", encoding="utf-8") as f:
+                children.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:  # the thread exited since the listing
+            continue
+    return children
+
+
+def _scanned_children() -> dict[int, list[int]]:
+    """Returns the child processes of every process, scanning all of `/proc`."""
+    children: dict[int, list[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", encoding="utf-8") as f:
+                stat = f.read()
+        except OSError:  # exited since the listing
+            continue
+        # the command (in parentheses) may contain spaces; the parent follows it
+        parent = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(parent, []).append(int(name))
+    return children
+
+
+class _PeakRSS:
+    """
+    Samples the resident memory of this process and its descendants (the Tesseract
+    processes) in the background while in use. The peak is None where `/proc` is
+    not available.
+
+    The descendants are found through `/proc/<pid>/task/*/children`. Kernels without
+    it require scanning every process of the host, which is done only every
+    `scan_interval` seconds so as not to slow the measured process down.
+    """
+
+    def __init__(self, interval: float = 0.05, scan_interval: float = 1.0) -> None:
+        self.interval = interval
+        self.scan_every = max(1, round(scan_interval / interval))
+        self.peak: int | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _tree_rss(self, scanned: dict[int, list[int]] | None) -> int:
+        rss = 0
+        tree = [os.getpid()]
+        while tree:
+            pid = tree.pop()
+            try:
+                rss += _rss_bytes(pid)
+                tree.extend(_children(pid) if scanned is None else scanned.get(pid, []))
+            except (OSError, ValueError):  # exited since it was found
+                continue
+        return rss
+
+    def _sample(self) -> None:
+        if not os.path.exists(f"/proc/{os.getpid()}/statm"):
+            return
+        has_children = os.path.exists(
+            f"/proc/{os.getpid()}/task/{os.getpid()}/children"
+        )
+
+        samples = 0
+        while True:
+            if has_children:
+                rss = self._tree_rss(None)
+            elif samples % self.scan_every == 0:
+                rss = self._tree_rss(_scanned_children())
+            else:
+                rss = _rss_bytes(os.getpid())
+            self.peak = rss if self.peak is None else max(self.peak, rss)
+
+            samples += 1
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> _PeakRSS:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> float | None:
+        return None if self.peak is None else self.peak / 1024**2
+
+
+def _set_threads(threads: int) -> None:
+    """Limits the threads of OpenCV, PyTorch and (new) Tesseract processes."""
+    import torch
+
+    cv2.setNumThreads(threads)
+    torch.set_num_threads(threads)
+    os.environ["OMP_THREAD_LIMIT"] = str(threads)
+
+
+def _as_float(value: typing.Any) -> float | None:
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _score_invoice(
+    extracted_info: dict[str, typing.Any], fields: dict[str, typing.Any]
+) -> dict[str, bool]:
+    """Checks every field extracted from a synthesized receipt."""
+    return {
+        "place": str(extracted_info["place"]).strip().lower()
+        == fields["place"].lower(),
+        "date": fields["date"] in extracted_info["date"],
+        "phone_number": fields["phone_number"] in extracted_info["phone_number"],
+        "order_number": str(extracted_info["order_number"]) == fields["order_number"],
+        "price": _as_float(extracted_info["price"]) == fields["price"],
+    }
+
+
+def run_load_test(
+    mode: str,
+    *,
+    n_documents: int = 10,
+    concurrency: int = 1,
+    kind: str = "page",
+    scale: float = 1.0,
+    skew: float = 0.0,
+    noise: float = 0.0,
+    seed: int = 0,
+    threads: int | None = None,
+    warmup: int = 1,
+    options: dict[str, typing.Any] | None = None,
+) -> dict[str, typing.Any]:
+    """
+    Synthesizes documents and processes them concurrently, measuring speed and
+    accuracy together.
+
+    Args:
+        mode:
+            "preprocess" (the `Preprocessor` pipeline of `OCR`), or an OCR mode
+            ("meaningful", "sparse", "cascaded" or "invoice"; see
+            `ocred.server.run_job`). The "invoice" mode also runs the invoice
+            extractor, and requires receipts.
+        n_documents:
+            Number of synthesized documents.
+        concurrency:
+            Number of documents processed at the same time (by threads of this
+            process).
+        kind:
+            "page" (see `synthesize_page`) or "receipt" (see `synthesize_receipt`).
+        scale:
+            Resolution of the documents.
+        skew:
+            Angle (in degrees) by which the documents are rotated.
+        noise:
+            Standard deviation of the Gaussian noise added to the documents.
+        seed:
+            Seed of the first document; the following documents use the next seeds.
+        threads:
+            Number of threads used by OpenCV, PyTorch and Tesseract (affects the
+            whole process). Uses their defaults if None.
+        warmup:
+            Number of documents processed (and not measured) before the run, so that
+            loading the models is not counted in the latencies.
+        options:
+            Keyword arguments passed down to the OCR method of the mode.
+
+    Returns:
+        report:
+            The parameters of the run, the "throughput" (documents per second), the
+            "latency" percentiles (in seconds), the "peak_rss_mb" of the process and
+            its Tesseract processes during the run (None without `/proc`), the mean
+            "cer" and "wer" (None for "preprocess" and "invoice"), the fraction of
+            receipts whose "fields" were extracted correctly (only for "invoice"),
+            and the "errors".
+    """
+    if mode not in _modes:
+        raise ValueError(f"mode must be one of {', '.join(_modes)}; got {mode!r}")
+    if kind not in ("page", "receipt"):
+        raise ValueError(f"kind must be page or receipt; got {kind!r}")
+    if mode == "invoice" and kind != "receipt":
+        raise ValueError("the invoice mode requires receipts")
+
+    if threads is not None:
+        _set_threads(threads)
+
+    def synthesize(seed: int) -> tuple[typing.Any, str, dict[str, typing.Any] | None]:
+        if kind == "page":
+            return (
+                *synthesize_page(scale=scale, skew=skew, noise=noise, seed=seed),
+                None,
+            )
+        return synthesize_receipt(scale=scale, skew=skew, noise=noise, seed=seed)
+
+    def process(path: str) -> tuple[float, dict[str, typing.Any] | None]:
+        start = time.perf_counter()
+        if mode == "preprocess":
+            _preprocess_image(path)
+            result = None
+        else:
+            result = run_job(
+                {
+                    "path": path,
+                    "mode": mode,
+                    "options": options or {},
+                    "invoice_info": mode == "invoice",
+                }
+            )
+        return time.perf_counter() - start, result
+
+    with tempfile.TemporaryDirectory() as directory:
+        # the warm-up documents use the seeds following the measured documents
+        documents = []
+        for i in range(n_documents + warmup):
+            img, text, fields = synthesize(seed + i)
+            path = os.path.join(directory, f"document-{i}.png")
+            cv2.imwrite(path, img)
+            documents.append((path, text, fields))
+        documents, warmup_documents = documents[:n_documents], documents[n_documents:]
+
+        # loading the models before measuring anything
+        for path, _, _ in warmup_documents:
+            try:
+                process(path)
+            except Exception as e:
+                logger.warning("warm-up failed: %s", e)
+
+        latencies, cers, wers, scores, errors = [], [], [], [], []
+        with _PeakRSS() as memory:
+            start = time.perf_counter()
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=concurrency
+            ) as executor:
+                futures = {
+                    executor.submit(process, path): (text, fields)
+                    for path, text, fields in documents
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        document_latency, result = future.result()
+                    except Exception as e:
+                        errors.append(f"{type(e).__name__}: {e}")
+                        continue
+
+                    latencies.append(document_latency)
+                    reference, fields = futures[future]
+                    if result is None:  # the preprocess mode
+                        continue
+                    if mode == "invoice" and fields is not None:
+                        scores.append(_score_invoice(result["invoice_info"], fields))
+                    else:
+                        cers.append(character_error_rate(reference, result["text"]))
+                        wers.append(word_error_rate(reference, result["text"]))
+            elapsed = time.perf_counter() - start
+
+    latency: dict[str, float] | None = None
+    if latencies:
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        latency = {
+            "mean": float(np.mean(latencies)),
+            "p50": float(p50),
+            "p90": float(p90),
+            "p99": float(p99),
+            "max": float(max(latencies)),
+        }
+
+    return {
+        "mode": mode,
+        "kind": kind,
+        "n_documents": n_documents,
+        "concurrency": concurrency,
+        "scale": scale,
+        "skew": skew,
+        "noise": noise,
+        "threads": threads,
+        "throughput": len(latencies) / elapsed,
+        "latency": latency,
+        "peak_rss_mb": memory.peak_mb,
+        "cer": float(np.mean(cers)) if cers else None,
+        "wer": float(np.mean(wers)) if wers else None,
+        "fields": (
+            {
+                field: float(np.mean([score[field] for score in scores]))
+                for field in scores[0]
+            }
+            if scores
+            else None
+        ),
+        "errors": errors,
+    }
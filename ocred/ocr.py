@@ -1,23 +1,252 @@
 from __future__ import annotations
 
+import functools
 import re
+import threading
 import typing
 
 import cv2
 import easyocr
+import numpy as np
+import numpy.typing as npt
 import pytesseract
 from scipy import ndimage
 
 from ocred.preprocessing import Preprocessor
+from ocred.profiles import Profile, get_profile
+from ocred.scripts import detect_script, profile_for_script
+
+# labels of the lines holding the fields of an invoice
+_invoice_anchors = re.compile(
+    r"\b(?:order|total|date|bill|invoice|inv|phone|ph|tel|mob|contact|amount|amt|rs|inr)\b|₹",
+    re.IGNORECASE,
+)
+# unlabelled dates and phone (or order) numbers; item quantities are not matched
+_invoice_values = re.compile(r"\d{1,2}[./-]\d{1,2}[./-]\d{2,4}|\d{5,}")
+
+
+def _device(gpu: bool | None) -> str:
+    """Returns the device easyocr runs on, picked the same way easyocr picks it."""
+    import torch
+
+    if gpu and torch.cuda.is_available():
+        return "cuda"
+    if gpu and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+# lru_cache does not stop concurrent calls from loading the same models twice
+_reader_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _load_reader(
+    languages: tuple[str, ...], device: str, quantize: bool
+) -> easyocr.Reader:
+    reader = easyocr.Reader(
+        list(languages),
+        gpu=False if device == "cpu" else device,
+        quantize=quantize,
+        detector=False,
+    )
+
+    # easyocr (<= 1.7.2) stores `quantize` as a tuple, which always quantizes the
+    # detector on the CPU; loading the detector after fixing it
+    reader.quantize = quantize
+    reader.setDetector("craft")
+
+    return reader
+
+
+def _get_reader(
+    languages: tuple[str, ...],
+    *,
+    gpu: bool | None = True,
+    quantize: bool | None = True,
+) -> easyocr.Reader:
+    """
+    Returns an easyocr reader for the given languages, loading its models only the
+    first time the languages are requested on the same device with the same
+    `quantize`.
+    """
+    # caching by the device actually used, so that gpu=True and gpu=False share the
+    # reader on machines without a GPU
+    with _reader_lock:
+        return _load_reader(tuple(languages), _device(gpu), bool(quantize))
+
+
+def _set_threads(threads: int | None) -> None:
+    """Sets the number of threads used by PyTorch (in the whole process)."""
+    if threads is not None:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+def _batch_size(reader: easyocr.Reader, n_boxes: int) -> int:
+    """
+    Picks the recognition batch size from the number of detected boxes. easyocr
+    recognizes the boxes one at a time on the CPU, whatever the batch size, so
+    batches are only used on the GPU, where all the boxes are padded to the width of
+    the widest one.
+    """
+    if reader.device == "cpu":
+        return 1
+    return max(1, min(n_boxes, 32))
+
+
+def _recognize_boxes(
+    reader: easyocr.Reader,
+    img_grey: typing.Any,
+    boxes: list[list[int]],
+    *,
+    decoder: str | None = "greedy",
+    allowlist: str | None = None,
+) -> list[typing.Any]:
+    """
+    Recognizes the text inside the given boxes without running easyocr's detection
+    stage.
+
+    Args:
+        reader:
+            The easyocr reader used for recognition.
+        img_grey:
+            The grayscale image containing the boxes.
+        boxes:
+            Boxes in easyocr's horizontal format - [x_min, x_max, y_min, y_max].
+        decoder:
+            Decoder passed down to easyocr ("greedy" or "beamsearch").
+        allowlist:
+            The only characters that can be recognized; all characters if None.
+
+    Returns:
+        recognized:
+            One easyocr result (box, text, confidence) per input box, in the same
+            order, or None if easyocr dropped the box.
+    """
+    if not boxes:
+        return []
+
+    height, width = img_grey.shape[:2]
+    boxes = [
+        [
+            max(0, int(x_min)),
+            min(width, int(x_max)),
+            max(0, int(y_min)),
+            min(height, int(y_max)),
+        ]
+        for x_min, x_max, y_min, y_max in boxes
+    ]
+
+    recognized = reader.recognize(
+        img_grey,
+        horizontal_list=boxes,
+        free_list=[],
+        decoder=decoder,
+        batch_size=_batch_size(reader, len(boxes)),
+        allowlist=allowlist,
+        reformat=False,
+    )
+
+    # easyocr may reorder or drop boxes; match them using their corners
+    by_corner = {
+        (int(result[0][0][0]), int(result[0][0][1])): result for result in recognized
+    }
+    return [by_corner.get((box[0], box[2])) for box in boxes]
+
+
+def _quads(
+    x: npt.NDArray[np.int32],
+    y: npt.NDArray[np.int32],
+    w: npt.NDArray[np.int32],
+    h: npt.NDArray[np.int32],
+) -> npt.NDArray[np.int32]:
+    """Converts (x, y, width, height) boxes to an (N, 4, 2) array of their corners."""
+    return np.stack(
+        [
+            np.stack([x, y], axis=-1),
+            np.stack([x + w, y], axis=-1),
+            np.stack([x + w, y + h], axis=-1),
+            np.stack([x, y + h], axis=-1),
+        ],
+        axis=1,
+    ).astype(np.int32)
+
+
+def _tesseract_boxes(
+    data: dict[str, list[typing.Any]],
+) -> tuple[npt.NDArray[np.int32], npt.NDArray[np.float64]]:
+    """
+    Returns the corners and confidences (between 0 and 1) of the words in
+    Tesseract's `image_to_data` output.
+    """
+    # if the data has a word
+    words = np.char.strip(np.asarray(data["text"], dtype=str)) != ""
+    x, y, w, h = (
+        np.asarray(data[key], dtype=np.int32)[words]
+        for key in ("left", "top", "width", "height")
+    )
+    confidences = np.asarray(data["conf"], dtype=np.float64)[words] / 100
+
+    return _quads(x, y, w, h), np.clip(confidences, 0, 1)
+
+
+def _easyocr_boxes(
+    detailed_text: typing.Any,
+) -> tuple[npt.NDArray[np.int32], npt.NDArray[np.float64]]:
+    """Returns the corners and confidences of the words found by easyocr."""
+    if not detailed_text:
+        return np.empty((0, 4, 2), dtype=np.int32), np.empty(0, dtype=np.float64)
+
+    boxes = np.array([text[0] for text in detailed_text], dtype=np.float64)
+    confidences = np.array([text[2] for text in detailed_text], dtype=np.float64)
+    return boxes.round().astype(np.int32), confidences
+
+
+def _preprocess_image(
+    path: str,
+) -> npt.NDArray[np.int64] | npt.NDArray[np.float64]:
+    """
+    Preprocesses a real life photo of a document (see `OCR`), returning the scanned,
+    deskewed and denoised grayscale image.
+    """
+    preprocessed = Preprocessor(path)
+
+    # scan the image and copy the scanned image
+    orig = preprocessed.scan().copy()
+
+    # remove noise
+    preprocessed.remove_noise()
+
+    # thicken the ink to draw Hough lines better
+    preprocessed.thicken_font()
+
+    # calculate the median angle of all the Hough lines
+    _, median_angle = preprocessed.rotate()
+
+    # rotate the original scanned image
+    rotated = ndimage.rotate(orig, median_angle)
+
+    # remove noise again
+    return Preprocessor(rotated).remove_noise()
+
+
+# boxes with a confidence below 0.5 are red, below 0.8 are orange, and green otherwise
+_confidence_bins = [0.5, 0.8]
+_confidence_colors = [(0, 0, 255), (0, 165, 255), (0, 255, 0)]
 
 
 class OCR:
     """
-    Performs OCR on a given image, saves an image with boxes around the words, and
-    converts the extracted text to an MP3 file.
+    Performs OCR on a given image, and draws boxes around the OCRed words on demand.
 
     Add Tesseract OCR's installation location in PATH for functions using it to work.
 
+    The image is decoded (or preprocessed) only once, and the artifacts derived from
+    it (the grayscale image, detected text boxes, Tesseract's output) are shared by
+    all the methods called on the same object.
+
     Args:
 
         preprocess:
@@ -26,6 +255,7 @@ class OCR:
             preprocess the image.
             Set False if the image is a scanned photo (an e-book). It will not be
             pre-processed before OCRing.
+            The preprocessed image is kept in memory (see `image`), and is not saved.
             Use the `Preprocessor` class manually to have more control!
         path:
             Path of the image to be used.
@@ -45,48 +275,100 @@ class OCR:
         self.path = path
         self.preprocess = preprocess
 
-        if self.preprocess:
-            preprocessed = Preprocessor(self.path)
+        # the decoded image and everything derived from it, shared by all methods
+        self._artifacts: dict[typing.Any, typing.Any] = {}
 
-            # scan the image and copy the scanned image
-            preprocessed.scan()
-            orig = preprocessed.img.copy()
+        # the boxes around the OCRed words and their confidences (see draw_boxes)
+        self._boxes: npt.NDArray[np.int32] | None = None
+        self._confidences: npt.NDArray[np.float64] | None = None
+
+        if self.preprocess:
+            # kept in memory, so that concurrent OCR objects never share a file
+            self._artifacts["image"] = cv2.cvtColor(
+                _preprocess_image(self.path), cv2.COLOR_GRAY2BGR
+            )
 
-            # remove noise
-            preprocessed.remove_noise()
+    def _artifact(
+        self, key: typing.Any, compute: typing.Callable[[], typing.Any]
+    ) -> typing.Any:
+        if key not in self._artifacts:
+            self._artifacts[key] = compute()
+        return self._artifacts[key]
+
+    @property
+    def image(self) -> typing.Any:
+        """The image (BGR), decoded or preprocessed only once."""
+        return self._artifact("image", lambda: cv2.imread(self.path))
+
+    @property
+    def grayscale(self) -> typing.Any:
+        """The grayscale image."""
+        return self._artifact(
+            "grayscale", lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        )
 
-            # thicken the ink to draw Hough lines better
-            preprocessed.thicken_font()
+    def _tesseract_data(self, config: str | None) -> dict[str, list[typing.Any]]:
+        return self._artifact(
+            ("tesseract_data", config),
+            lambda: pytesseract.image_to_data(
+                self.image, config=config, output_type=pytesseract.Output.DICT
+            ),
+        )
 
-            # calculate the median angle of all the Hough lines
-            _, median_angle = preprocessed.rotate()
+    def _easyocr_detection(
+        self, reader: easyocr.Reader
+    ) -> tuple[list[typing.Any], list[typing.Any]]:
+        def detect() -> tuple[list[typing.Any], list[typing.Any]]:
+            rgb = cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
+            horizontal_list, free_list = reader.detect(rgb, reformat=False)
+            return horizontal_list[0], free_list[0]
+
+        # all the readers share the same (CRAFT) detector, unless it runs on another
+        # device or is quantized differently
+        return self._artifact(
+            ("easyocr_detection", str(reader.device), reader.quantize), detect
+        )
 
-            # rotate the original scanned image
-            rotated = ndimage.rotate(orig, median_angle)
+    def detect_script(self) -> str:
+        """
+        Detects the script of the image using Tesseract's Orientation and Script
+        Detection, so that only the languages of the script are loaded while OCRing
+        with `profile="auto"`.
 
-            # remove noise again
-            preprocessed = Preprocessor(rotated)
-            preprocessed.remove_noise()
+        Returns:
+            script:
+                Name of the detected script (for example "Latin" or "Devanagari").
+                The script and Tesseract's confidence are also stored in `self.script`.
+        """
+        script, confidence = self._artifact("script", lambda: detect_script(self.image))
+        self.script = {"script": script, "confidence": confidence}
+        return script
 
-            cv2.imwrite("preprocessed.png", preprocessed.img)
-            self.path = "preprocessed.png"
+    def _resolve_profile(self, profile: str | Profile) -> Profile:
+        if profile == "auto":
+            return profile_for_script(self.detect_script())
+        return get_profile(profile)
 
     def ocr_meaningful_text(
         self,
         *,
         tesseract_config: str | None = "-l eng --oem 1",
         preserve_orientation: bool | None = False,
+        profile: str | Profile | None = None,
         save_output: bool | None = False,
     ) -> str:
         """
-        Performs OCR on long meaningful text documents and saves the image with boxes
-        around the words. For example - books, PDFs etc.
+        Performs OCR on long meaningful text documents. For example - books, PDFs etc.
+        Use `draw_boxes` to draw boxes around the words.
 
         Args:
             tesseract_config:
                 Configuration passed down to the Tesseract OCR Engine.
             preserve_orientation:
                 Preserves the orientation of OCRed text.
+            profile:
+                A named profile (see `ocred.profiles`) overriding `tesseract_config`,
+                or "auto" to pick the languages from the detected script.
             save_output:
                 Saves the text to `output.txt` file.
 
@@ -94,28 +376,17 @@ class OCR:
             text:
                 The extracted text.
         """
-        # reading the image
-        img = cv2.imread(self.path)
+        if profile is not None:
+            tesseract_config = self._resolve_profile(profile).tesseract_config
 
         # extracting the text
-        self.text = pytesseract.image_to_string(img, config=tesseract_config)
+        self.text = pytesseract.image_to_string(self.image, config=tesseract_config)
         if not preserve_orientation:
             self.text = self.text.replace("-\n", "").replace("\n", " ")
 
-        # adding boxes around the words
-        boxes = pytesseract.image_to_data(img)
-        for z, box in enumerate(boxes.splitlines()):
-            if z != 0:
-                box = box.split()
-
-                # if the data has a word
-                if len(box) == 12:
-                    x, y = int(box[6]), int(box[7])
-                    h, w = int(box[8]), int(box[9])
-
-                    cv2.rectangle(img, (x, y), (x + h, y + w), (0, 0, 255), 1)
-
-        cv2.imwrite("OCR.png", img)
+        # the boxes are found only if they are drawn (see draw_boxes)
+        self._boxes, self._confidences = None, None
+        self._tesseract_config = tesseract_config
 
         if save_output:
             self.save_output()
@@ -125,12 +396,17 @@ class OCR:
     def ocr_sparse_text(
         self,
         *,
-        languages: list[str] | None = ["en", "hi"],
+        languages: list[str] = ["en", "hi"],
         decoder: str | None = "greedy",
+        gpu: bool | None = True,
+        quantize: bool | None = True,
+        threads: int | None = None,
+        batch_size: int | None = None,
+        profile: str | Profile | None = None,
         save_output: bool | None = False,
     ) -> tuple[str, typing.Any]:
         """
-        Performs OCR on sparse text and saves the image with boxes around the words.
+        Performs OCR on sparse text (use `draw_boxes` to draw boxes around the words).
         This method can be used to OCR documents in which the characters don't form
         any proper/meaningful sentences, or if there are very less meaningful sentences,
         for example - bills, sign-boards etc.
@@ -143,6 +419,24 @@ class OCR:
             decoder:
                 If the document has a larger number of meaningful sentences then use
                 "beamsearch". For most of the cases "greedy" works very well.
+            gpu:
+                Uses the GPU if available. Set False to always run on the CPU.
+            quantize:
+                Dynamically quantizes the detection and recognition models to int8
+                when running on the CPU. Only the linear and recurrent layers are
+                quantized, so mostly the recognition gets faster, with a small loss in
+                accuracy.
+            threads:
+                Number of threads used by PyTorch on the CPU (affects the whole
+                process). Uses PyTorch's default if None.
+            batch_size:
+                Number of text boxes recognized together on the GPU; easyocr
+                recognizes them one at a time on the CPU. Picked from the number of
+                detected boxes if None.
+            profile:
+                A named profile (see `ocred.profiles`) overriding `languages` and
+                restricting the recognized characters to its whitelist, or "auto" to
+                pick the languages from the detected script.
             save_output:
                 Saves the text to `output.txt` file.
 
@@ -154,32 +448,331 @@ class OCR:
         """
         self.text = ""
 
-        # reading the image using open-cv and easyocr
-        img = cv2.imread(self.path)
-        reader = easyocr.Reader(
-            languages
+        allowlist = None
+        if profile is not None:
+            profile = self._resolve_profile(profile)
+            languages, allowlist = list(profile.easyocr_languages), profile.whitelist
+
+        _set_threads(threads)
+
+        # reading the image using easyocr
+        reader = _get_reader(
+            tuple(languages), gpu=gpu, quantize=quantize
         )  # slow for the first time (also depends upon CPU/GPU)
-        self.detailed_text: typing.Any = reader.readtext(
-            self.path, decoder=decoder, batch_size=5
+
+        # detecting the text first to pick the batch size from the number of boxes
+        horizontal_list, free_list = self._easyocr_detection(reader)
+        if batch_size is None:
+            batch_size = _batch_size(reader, len(horizontal_list) + len(free_list))
+
+        self.detailed_text: typing.Any = reader.recognize(
+            self.grayscale,
+            horizontal_list,
+            free_list,
+            decoder=decoder,
+            batch_size=batch_size,
+            allowlist=allowlist,
+            reformat=False,
         )
 
         for text in self.detailed_text:
-            # extracting the coordinates to highlight the text
-            coords_lower = text[0][:2]
-            coords_upper = text[0][2:4]
+            self.text = self.text + " " + text[-2]
 
-            coords_lower.sort(key=lambda x: x[0])
-            pt1 = [int(x) for x in coords_upper[-1]]
+        self._boxes, self._confidences = _easyocr_boxes(self.detailed_text)
 
-            coords_lower.sort(key=lambda x: x[0])
-            pt2 = [int(x) for x in coords_lower[-1]]
+        if save_output:
+            self.save_output()
 
-            # highlighting the text
-            cv2.rectangle(img, pt1, pt2, (0, 0, 255), 1)
+        return self.text, self.detailed_text
 
-            self.text = self.text + " " + text[-2]
+    def ocr_cascaded_text(
+        self,
+        *,
+        tesseract_config: str | None = "-l eng --oem 1",
+        min_confidence: float = 0.6,
+        fallback_min_confidence: float = 0.3,
+        padding: int = 2,
+        languages: list[str] = ["en"],
+        decoder: str | None = "greedy",
+        gpu: bool | None = True,
+        quantize: bool | None = True,
+        threads: int | None = None,
+        profile: str | Profile | None = None,
+        save_output: bool | None = False,
+    ) -> tuple[str, list[dict[str, typing.Any]]]:
+        """
+        Performs OCR using Tesseract first, and re-OCRs only the words Tesseract is
+        not confident about using easyocr. This gives easyocr-level accuracy on the
+        hard regions of a document at a cost close to that of Tesseract alone.
+
+        Args:
+            tesseract_config:
+                Configuration passed down to the Tesseract OCR Engine.
+            min_confidence:
+                Tesseract words with a confidence (between 0 and 1) lower than this
+                are re-OCRed using easyocr.
+            fallback_min_confidence:
+                The easyocr text replaces the Tesseract text only if its confidence
+                (between 0 and 1) is at least this and higher than Tesseract's
+                confidence.
+            padding:
+                Number of pixels added around each low-confidence box before
+                re-OCRing it.
+            languages:
+                A list of languages passed down to easyocr for the low-confidence
+                regions.
+            decoder:
+                Decoder passed down to easyocr ("greedy" or "beamsearch").
+            gpu:
+                Uses the GPU if available. Set False to always run on the CPU.
+            quantize:
+                Dynamically quantizes the easyocr models to int8 when running on the
+                CPU (see `ocr_sparse_text`).
+            threads:
+                Number of threads used by PyTorch on the CPU (affects the whole
+                process). Uses PyTorch's default if None.
+            profile:
+                A named profile (see `ocred.profiles`) overriding `tesseract_config`
+                and `languages`, or "auto" to pick the languages from the detected
+                script.
+            save_output:
+                Saves the text to `output.txt` file.
+
+        Returns:
+            text:
+                The extracted text.
+            words:
+                A list of dictionaries, one per word, with the "text", the
+                "confidence" (between 0 and 1), the "box" (x, y, width, height) and
+                the "engine" ("tesseract" or "easyocr") that produced the word.
+        """
+        allowlist = None
+        if profile is not None:
+            profile = self._resolve_profile(profile)
+            tesseract_config = profile.tesseract_config
+            languages, allowlist = list(profile.easyocr_languages), profile.whitelist
+
+        height, width = self.image.shape[:2]
+
+        # extracting the words with their confidences
+        data = self._tesseract_data(tesseract_config)
+
+        self.words: list[dict[str, typing.Any]] = []
+        low_confidence = []
+        for i, word in enumerate(data["text"]):
+            # if the data has a word
+            if not word.strip():
+                continue
+
+            x, y = int(data["left"][i]), int(data["top"][i])
+            w, h = int(data["width"][i]), int(data["height"][i])
+            confidence = max(float(data["conf"][i]), 0.0) / 100
+
+            self.words.append(
+                {
+                    "text": word,
+                    "confidence": confidence,
+                    "box": (x, y, w, h),
+                    "engine": "tesseract",
+                }
+            )
+            if confidence < min_confidence:
+                # easyocr expects [x_min, x_max, y_min, y_max] inside the image
+                low_confidence.append(
+                    (
+                        len(self.words) - 1,
+                        [
+                            max(0, x - padding),
+                            min(width, x + w + padding),
+                            max(0, y - padding),
+                            min(height, y + h + padding),
+                        ],
+                    )
+                )
+
+        # re-OCRing only the low-confidence regions, skipping the detection stage
+        if low_confidence:
+            _set_threads(threads)
+            reader = _get_reader(tuple(languages), gpu=gpu, quantize=quantize)
+            recognized = _recognize_boxes(
+                reader,
+                self.grayscale,
+                [box for _, box in low_confidence],
+                decoder=decoder,
+                allowlist=allowlist,
+            )
 
-        cv2.imwrite("OCR.png", img)
+            for (index, _), result in zip(low_confidence, recognized):
+                if result is None:
+                    continue
+
+                _, text, confidence = result
+                word = self.words[index]
+                if (
+                    text.strip()
+                    and confidence >= fallback_min_confidence
+                    and confidence > word["confidence"]
+                ):
+                    word.update(
+                        {
+                            "text": text,
+                            "confidence": float(confidence),
+                            "engine": "easyocr",
+                        }
+                    )
+
+        self.text = " ".join(word["text"] for word in self.words)
+
+        self._boxes = _quads(
+            *np.array([word["box"] for word in self.words], dtype=np.int32)
+            .reshape(-1, 4)
+            .T
+        )
+        self._confidences = np.array(
+            [word["confidence"] for word in self.words], dtype=np.float64
+        )
+
+        if save_output:
+            self.save_output()
+
+        return self.text, self.words
+
+    def ocr_invoice(
+        self,
+        *,
+        languages: list[str] = ["en", "hi"],
+        decoder: str | None = "greedy",
+        header_lines: int | None = 3,
+        gpu: bool | None = True,
+        quantize: bool | None = True,
+        threads: int | None = None,
+        profile: str | Profile | None = None,
+        save_output: bool | None = False,
+    ) -> tuple[str, typing.Any]:
+        """
+        Performs OCR only on the regions of an invoice that
+        `process_extracted_text_from_invoice` needs, instead of the whole invoice.
+
+        The text boxes are detected first and grouped into lines. The header lines are
+        always recognized (they contain the place), and for every other line only the
+        leftmost box (the label) is recognized. The rest of a line is recognized only if
+        its label is a keyword (order, total, date, phone, ...), a date or a long number
+        (a phone or order number). Item lines on long invoices are hence never fully
+        recognized.
+
+        Args:
+            languages:
+                A list of languages that the invoice possibly has.
+                Note: Provide only the languages that are present in the image, adding
+                additional languages misguides the model.
+            decoder:
+                Decoder passed down to easyocr ("greedy" or "beamsearch").
+            header_lines:
+                Number of lines at the top of the invoice that are always recognized.
+            gpu:
+                Uses the GPU if available. Set False to always run on the CPU.
+            quantize:
+                Dynamically quantizes the easyocr models to int8 when running on the
+                CPU (see `ocr_sparse_text`).
+            threads:
+                Number of threads used by PyTorch on the CPU (affects the whole
+                process). Uses PyTorch's default if None.
+            profile:
+                A named profile (see `ocred.profiles`) overriding `languages` and
+                restricting the recognized characters to its whitelist, or "auto" to
+                pick the languages from the detected script.
+            save_output:
+                Saves the text to `output.txt` file.
+
+        Returns:
+            text:
+                The extracted text.
+            detailed_text:
+                Text with extra information (in the format returned by
+                easyocr.Reader.readtext()), in reading order.
+        """
+        self.text = ""
+
+        allowlist = None
+        if profile is not None:
+            profile = self._resolve_profile(profile)
+            languages, allowlist = list(profile.easyocr_languages), profile.whitelist
+
+        _set_threads(threads)
+        reader = _get_reader(tuple(languages), gpu=gpu, quantize=quantize)
+
+        # detecting the text boxes without recognizing them
+        horizontal_list, free_list = self._easyocr_detection(reader)
+        boxes = list(horizontal_list) + [
+            [
+                min(x for x, _ in box),
+                max(x for x, _ in box),
+                min(y for _, y in box),
+                max(y for _, y in box),
+            ]
+            for box in free_list
+        ]
+
+        # grouping the boxes into lines using their vertical centers
+        lines: list[list[list[int]]] = []
+        for box in sorted(boxes, key=lambda box: (box[2] + box[3]) / 2):
+            center = (box[2] + box[3]) / 2
+            if lines and lines[-1][0][2] <= center <= lines[-1][0][3]:
+                lines[-1].append(box)
+            else:
+                lines.append([box])
+        for line in lines:
+            line.sort(key=lambda box: box[0])
+
+        # recognizing the header lines and the labels of the remaining lines
+        first_pass = [box for line in lines[:header_lines] for box in line] + [
+            line[0] for line in lines[header_lines:]
+        ]
+        recognized = dict(
+            zip(
+                map(tuple, first_pass),
+                _recognize_boxes(
+                    reader,
+                    self.grayscale,
+                    first_pass,
+                    decoder=decoder,
+                    allowlist=allowlist,
+                ),
+            )
+        )
+
+        # recognizing the rest of the lines anchored by their labels
+        second_pass = []
+        for line in lines[header_lines:]:
+            label = recognized[tuple(line[0])]
+            if label is not None and (
+                _invoice_anchors.search(label[1]) or _invoice_values.search(label[1])
+            ):
+                second_pass.extend(line[1:])
+        recognized.update(
+            zip(
+                map(tuple, second_pass),
+                _recognize_boxes(
+                    reader,
+                    self.grayscale,
+                    second_pass,
+                    decoder=decoder,
+                    allowlist=allowlist,
+                ),
+            )
+        )
+
+        self.detailed_text = []
+        for line in lines:
+            for box in line:
+                result = recognized.get(tuple(box))
+                if result is None or not result[1].strip():
+                    continue
+
+                self.detailed_text.append(result)
+                self.text = self.text + " " + result[1]
+
+        self._boxes, self._confidences = _easyocr_boxes(self.detailed_text)
 
         if save_output:
             self.save_output()
@@ -188,8 +781,8 @@ class OCR:
 
     def process_extracted_text_from_invoice(self) -> dict[str, typing.Any]:
         """
-        This method processes the extracted text from invoices, and returns some useful
-        information.
+        This method processes the extracted text from invoices (OCRed using
+        `ocr_sparse_text` or `ocr_invoice`), and returns some useful information.
 
         Returns:
             extracted_info:
@@ -251,7 +844,8 @@ class OCR:
                 r"(?:Rs\.?|INR|₹\.?|रे\.?)\s*(\d+(?:[.,]\d+)*)|(\d+(?:[.,]\d+)*)\s*(?:Rs\.?|INR)",
                 self.text,
             )
-            price = list(map(float, price))
+            # one of the two groups matched
+            price = [float(before or after) for before, after in price]
             price = max(price)
         # try finding numbers with "grand total" or "total" written in front of them
         except ValueError:
@@ -278,6 +872,62 @@ class OCR:
 
         return self.extracted_info
 
+    def draw_boxes(
+        self,
+        path: str | None = None,
+        *,
+        png: bool | None = False,
+        color_by_confidence: bool | None = False,
+        thickness: int = 1,
+    ) -> typing.Any:
+        """
+        Draws boxes around the OCRed words. The boxes are never drawn while OCRing,
+        so nothing is spent on them unless this method is called.
+
+        Args:
+            path:
+                Saves the image with the boxes at this path (for example "OCR.png").
+            png:
+                Returns the image encoded as PNG bytes instead of an array.
+            color_by_confidence:
+                Colors the boxes by the confidence of the OCR engine - red below 0.5,
+                orange below 0.8, and green otherwise. All boxes are red otherwise.
+            thickness:
+                Thickness of the lines of the boxes.
+
+        Returns:
+            img:
+                The image with the boxes, as an array or as PNG bytes.
+        """
+        if self._boxes is None or self._confidences is None:
+            # the boxes of ocr_meaningful_text are found only now
+            if not hasattr(self, "_tesseract_config"):
+                raise ValueError("no text OCRed; OCR a document first")
+            self._boxes, self._confidences = _tesseract_boxes(
+                self._tesseract_data(self._tesseract_config)
+            )
+        boxes, confidences = self._boxes, self._confidences
+
+        img = self.image.copy()
+
+        # drawing all the boxes of a color at once
+        if color_by_confidence:
+            buckets = np.digitize(confidences, _confidence_bins)
+            for bucket, color in enumerate(_confidence_colors):
+                if (buckets == bucket).any():
+                    cv2.polylines(
+                        img, list(boxes[buckets == bucket]), True, color, thickness
+                    )
+        elif len(boxes):
+            cv2.polylines(img, list(boxes), True, (0, 0, 255), thickness)
+
+        if path is not None:
+            cv2.imwrite(path, img)
+
+        if png:
+            return cv2.imencode(".png", img)[1].tobytes()
+        return img
+
     def save_output(self) -> None:
         """Saves the extracted text in the `output.txt` file."""
         if not hasattr(self, "text"):
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import dataclasses
+import shlex
+import sys
+
+import pytesseract
+
+
+def _windows() -> bool:
+    # the same check as pytesseract
+    return sys.platform.startswith("win32")
+
+
+@dataclasses.dataclass(frozen=True)
+class Profile:
+    """
+    A named OCR configuration, validated and resolved once, and shared by every call
+    using it.
+
+    Args:
+        name:
+            Name of the profile.
+        tesseract_languages:
+            Languages (Tesseract codes, for example "eng") passed down to Tesseract.
+        easyocr_languages:
+            Languages (easyocr codes, for example "en") passed down to easyocr.
+        oem:
+            Tesseract's OCR Engine Mode (0 to 3).
+        psm:
+            Tesseract's Page Segmentation Mode (0 to 13). Simpler modes are faster,
+            for example 6 (a single uniform block of text) for receipts.
+        whitelist:
+            The only characters that can be recognized; all characters if None.
+            Cannot contain whitespace on Windows, where pytesseract does not unquote
+            the configuration.
+        dpi:
+            Resolution of the images passed down to Tesseract; guessed if None.
+
+    Examples:
+        >>> from ocred.profiles import Profile
+        >>> Profile("receipt", psm=6, dpi=300).tesseract_config
+        '-l eng --oem 1 --psm 6 --dpi 300'
+    """
+
+    name: str
+    tesseract_languages: tuple[str, ...] = ("eng",)
+    easyocr_languages: tuple[str, ...] = ("en",)
+    oem: int = 1
+    psm: int = 3
+    whitelist: str | None = None
+    dpi: int | None = None
+
+    def __post_init__(self) -> None:
+        # tuples, so that profiles (and the readers cached by their languages) hash
+        object.__setattr__(self, "tesseract_languages", tuple(self.tesseract_languages))
+        object.__setattr__(self, "easyocr_languages", tuple(self.easyocr_languages))
+
+        if not self.tesseract_languages or not self.easyocr_languages:
+            raise ValueError(f"profile {self.name!r} must have at least one language")
+        if not 0 <= self.oem <= 3:
+            raise ValueError(f"oem must be between 0 and 3; got {self.oem}")
+        if not 0 <= self.psm <= 13:
+            raise ValueError(f"psm must be between 0 and 13; got {self.psm}")
+        if self.dpi is not None and self.dpi <= 0:
+            raise ValueError(f"dpi must be positive; got {self.dpi}")
+        if (
+            self.whitelist is not None
+            and _windows()
+            and any(character.isspace() for character in self.whitelist)
+        ):
+            raise ValueError("the whitelist cannot contain whitespace on Windows")
+
+    @property
+    def tesseract_config(self) -> str:
+        """The configuration passed down to the Tesseract OCR Engine."""
+        config = (
+            f"-l {'+'.join(self.tesseract_languages)} --oem {self.oem} --psm {self.psm}"
+        )
+        if self.dpi is not None:
+            config += f" --dpi {self.dpi}"
+        if self.whitelist is not None:
+            # pytesseract splits the configuration like a POSIX shell, except on
+            # Windows, where quotes are kept as they are
+            whitelist = self.whitelist if _windows() else shlex.quote(self.whitelist)
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        return config
+
+    def warm(self, *, gpu: bool | None = True, quantize: bool | None = True) -> None:
+        """
+        Checks that Tesseract has the languages of the profile, and loads the easyocr
+        models of the profile.
+
+        Args:
+            gpu:
+                Loads the models used by `OCR.ocr_sparse_text` with the same `gpu`.
+            quantize:
+                Loads the models used by `OCR.ocr_sparse_text` with the same
+                `quantize`.
+        """
+        from ocred.ocr import _get_reader
+
+        missing = set(self.tesseract_languages) - set(pytesseract.get_languages())
+        if missing:
+            raise ValueError(
+                f"Tesseract has no data for {', '.join(sorted(missing))}; "
+                f"install it to use the {self.name!r} profile"
+            )
+        _get_reader(self.easyocr_languages, gpu=gpu, quantize=quantize)
+
+
+_profiles: dict[str, Profile] = {}
+
+
+def register_profile(profile: Profile) -> None:
+    """
+    Registers a profile, replacing any profile with the same name.
+
+    Args:
+        profile:
+            The profile to register.
+    """
+    _profiles[profile.name] = profile
+
+
+def get_profile(profile: str | Profile) -> Profile:
+    """
+    Returns a registered profile.
+
+    Args:
+        profile:
+            Name of the profile. Profiles are returned as is.
+
+    Returns:
+        profile:
+            The profile.
+
+    Examples:
+        >>> from ocred.profiles import get_profile
+        >>> get_profile("receipt-en-hi").easyocr_languages
+        ('en', 'hi')
+    """
+    if isinstance(profile, Profile):
+        return profile
+    try:
+        return _profiles[profile]
+    except KeyError:
+        raise ValueError(
+            f"unknown profile {profile!r}; use one of {', '.join(sorted(_profiles))}"
+        ) from None
+
+
+def list_profiles() -> list[str]:
+    """Returns the names of all registered profiles."""
+    return sorted(_profiles)
+
+
+# full page segmentation, to keep the columns of book pages apart
+register_profile(Profile("book-en", psm=3))
+# receipts are a single block of text; skipping the layout analysis is faster
+register_profile(
+    Profile(
+        "receipt-en-hi",
+        tesseract_languages=("eng", "hin"),
+        easyocr_languages=("en", "hi"),
+        psm=6,
+    )
+)
+# sign boards have a few words scattered around the image
+register_profile(Profile("signboard", psm=11))
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import typing
+
+import pytesseract
+
+from ocred.profiles import Profile
+
+logger = logging.getLogger(__name__)
+
+# Tesseract OSD script -> (Tesseract languages, easyocr languages); the non-Latin
+# easyocr models also read English, which is commonly mixed with other scripts
+_scripts = {
+    "Latin": (("eng",), ("en",)),
+    "Devanagari": (("hin", "eng"), ("hi", "en")),
+    "Bengali": (("ben", "eng"), ("bn", "en")),
+    "Tamil": (("tam", "eng"), ("ta", "en")),
+    "Telugu": (("tel", "eng"), ("te", "en")),
+    "Kannada": (("kan", "eng"), ("kn", "en")),
+    "Arabic": (("ara", "eng"), ("ar", "en")),
+    "Cyrillic": (("rus", "eng"), ("ru", "en")),
+    "Thai": (("tha", "eng"), ("th", "en")),
+    "Han": (("chi_sim", "eng"), ("ch_sim", "en")),
+    "Japanese": (("jpn", "eng"), ("ja", "en")),
+    "Katakana": (("jpn", "eng"), ("ja", "en")),
+    "Hiragana": (("jpn", "eng"), ("ja", "en")),
+    "Hangul": (("kor", "eng"), ("ko", "en")),
+}
+
+
+def detect_script(img: typing.Any) -> tuple[str, float]:
+    """
+    Detects the script of an image using Tesseract's Orientation and Script Detection
+    (requires Tesseract's `osd` data).
+
+    Falls back to "Latin" (with a confidence of 0) if Tesseract cannot find enough
+    text, or detects a script that OCRed does not support.
+
+    Args:
+        img:
+            The image.
+
+    Returns:
+        script:
+            Name of the script, as reported by Tesseract (for example "Devanagari").
+        confidence:
+            Tesseract's confidence in the detected script.
+    """
+    try:
+        # pytesseract already runs Tesseract with --psm 0 (OSD only)
+        osd = pytesseract.image_to_osd(img, output_type=pytesseract.Output.DICT)
+    except pytesseract.TesseractError as e:
+        logger.debug("script detection failed: %s", e)
+        return "Latin", 0.0
+
+    if osd["script"] not in _scripts:
+        logger.debug("unsupported script %s; falling back to Latin", osd["script"])
+        return "Latin", 0.0
+
+    return osd["script"], float(osd["script_conf"])
+
+
+def profile_for_script(script: str, *, base: Profile | None = None) -> Profile:
+    """
+    Returns a profile with the minimal set of languages needed to OCR a script.
+
+    Args:
+        script:
+            Name of the script (see `detect_script`).
+        base:
+            The profile whose other settings (OEM, PSM, whitelist, DPI) are kept.
+
+    Returns:
+        profile:
+            The profile.
+
+    Examples:
+        >>> from ocred.scripts import profile_for_script
+        >>> profile_for_script("Devanagari").easyocr_languages
+        ('hi', 'en')
+    """
+    if script not in _scripts:
+        raise ValueError(
+            f"unsupported script {script!r}; use one of {', '.join(sorted(_scripts))}"
+        )
+
+    tesseract_languages, easyocr_languages = _scripts[script]
+    return dataclasses.replace(
+        Profile("auto") if base is None else base,
+        name=f"{'auto' if base is None else base.name}-{script.lower()}",
+        tesseract_languages=tesseract_languages,
+        easyocr_languages=easyocr_languages,
+    )
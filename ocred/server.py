@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import http.server
+import inspect
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+import typing
+
+from ocred.ocr import OCR, _get_reader
+from ocred.profiles import get_profile
+
+logger = logging.getLogger(__name__)
+
+_modes = {
+    "meaningful": "ocr_meaningful_text",
+    "sparse": "ocr_sparse_text",
+    "cascaded": "ocr_cascaded_text",
+    "invoice": "ocr_invoice",
+}
+
+
+# options of the OCR methods shared by every job running in the process - the
+# output.txt file in the working directory, and the number of PyTorch threads
+_process_wide_options = ("save_output", "threads")
+
+
+def _to_builtin(obj: typing.Any) -> typing.Any:
+    """Converts numpy scalars and arrays returned by the OCR engines to JSON types."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"object of type {type(obj).__name__} is not JSON serializable")
+
+
+def run_job(job: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    """
+    Runs a single OCR job.
+
+    Args:
+        job:
+            A dictionary with the "path" of the image, the "mode" ("meaningful",
+            "sparse", "cascaded" or "invoice"), whether to "preprocess" the image,
+            the keyword arguments ("options") passed down to the OCR method, and
+            whether to also extract the "invoice_info". Named profiles (see
+            `ocred.profiles`) can be passed as the "profile" option. The
+            "save_output" and "threads" options affect the whole process, and are
+            rejected.
+
+    Returns:
+        result:
+            A dictionary with the extracted "text", the "details" returned by the OCR
+            method (if any), the detected "script" (if the "auto" profile was used),
+            and the extracted "invoice_info" (if asked for).
+    """
+    # jobs are decoded from untrusted JSON, whatever their annotation says
+    if not isinstance(job, dict) or "path" not in job:  # type: ignore[redundant-expr]
+        raise ValueError("a job must be a JSON object with a path")
+
+    mode = job.get("mode", "meaningful")
+    if mode not in _modes:
+        raise ValueError(f"mode must be one of {', '.join(_modes)}; got {mode!r}")
+    if not os.path.isfile(job["path"]):
+        raise ValueError(f"no image found at {job['path']!r}")
+
+    options = job.get("options", {})
+    if not isinstance(options, dict):
+        raise ValueError("the options must be a JSON object")
+    unsafe = sorted(set(options) & set(_process_wide_options))
+    if unsafe:
+        raise ValueError(
+            f"{', '.join(unsafe)} cannot be set per job; "
+            "they change the state of the whole process"
+        )
+    # rejecting unknown options before the (slow) preprocessing and OCR
+    try:
+        inspect.signature(getattr(OCR, _modes[mode])).bind(None, **options)
+    except TypeError as e:
+        raise ValueError(f"invalid options for the {mode} mode: {e}") from None
+
+    ocr = OCR(bool(job.get("preprocess", False)), job["path"])
+    output = getattr(ocr, _modes[mode])(**options)
+
+    result: dict[str, typing.Any] = {"text": ocr.text, "details": None}
+    if isinstance(output, tuple):
+        result["details"] = output[1]
+    if hasattr(ocr, "script"):
+        result["script"] = ocr.script
+    if job.get("invoice_info", False):
+        result["invoice_info"] = ocr.process_extracted_text_from_invoice()
+
+    return result
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    server: Server
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send(200, self.server.metrics())
+        else:
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/ocr":
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            job = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send(400, {"error": "the request body must be valid JSON"})
+            return
+
+        self._send(*self.server.submit(job))
+
+    def _send(self, status: int, body: dict[str, typing.Any]) -> None:
+        data = json.dumps(body, default=_to_builtin).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        logger.debug(format, *args)
+
+
+class Server(http.server.ThreadingHTTPServer):
+    """
+    A long-lived local OCR worker that keeps the OCR engines warm between jobs.
+
+    The server listens on a localhost HTTP endpoint and exposes -
+
+    - `POST /ocr`: runs a job (see `run_job`) and returns its result;
+    - `GET /health`: returns `{"status": "ok"}`;
+    - `GET /metrics`: returns the number of queued, active, completed, failed and
+      rejected jobs, and the time spent OCRing.
+
+    Jobs wait in a queue until one of the `max_concurrency` slots is free. Once the
+    queue is full, new jobs are rejected with a 503 status.
+
+    The worker has no authentication, and OCRs any image path it can read. Listening
+    on an address other than a loopback address (for example "0.0.0.0") exposes it
+    to the network, and logs a warning.
+
+    Note: Jobs cannot set the "save_output" and "threads" options, which would
+    affect every job running in the server (see `run_job`).
+
+    Args:
+        address:
+            The (host, port) to listen on. Use port 0 to pick a free port.
+        max_concurrency:
+            Maximum number of jobs running at the same time.
+        max_queue:
+            Maximum number of jobs waiting for a free slot.
+        warm_languages:
+            Lists of languages whose easyocr models are loaded before serving.
+        warm_profiles:
+            Names of the profiles (see `ocred.profiles`) warmed before serving.
+
+    Examples:
+        >>> import threading
+        >>> from ocred.server import Server
+        >>> server = Server(("127.0.0.1", 0))
+        >>> thread = threading.Thread(target=server.serve_forever, daemon=True)
+        >>> thread.start()
+        >>> server.shutdown()
+        >>> server.server_close()
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 8765),
+        *,
+        max_concurrency: int = 1,
+        max_queue: int = 64,
+        warm_languages: list[list[str]] | None = None,
+        warm_profiles: list[str] | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._counts = {
+            "queued": 0,
+            "active": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+        }
+        self._busy_seconds = 0.0
+        self._started = time.monotonic()
+
+        # loading the models before accepting any job
+        for languages in warm_languages or []:
+            _get_reader(tuple(languages))
+        for profile in warm_profiles or []:
+            get_profile(profile).warm()
+
+        if not _is_loopback(address[0]):
+            logger.warning(
+                "the OCR worker listens on %r, which is not a loopback address; "
+                "anyone who can reach it can OCR any image the worker can read",
+                address[0],
+            )
+
+        super().__init__(address, _Handler)
+
+    def submit(self, job: dict[str, typing.Any]) -> tuple[int, dict[str, typing.Any]]:
+        """
+        Queues a job, runs it once a slot is free, and returns the HTTP status and
+        body of the response.
+        """
+        with self._lock:
+            if self._counts["queued"] >= self.max_queue:
+                self._counts["rejected"] += 1
+                return 503, {"error": "the queue is full; try again later"}
+            self._counts["queued"] += 1
+
+        with self._slots:
+            with self._lock:
+                self._counts["queued"] -= 1
+                self._counts["active"] += 1
+
+            start = time.monotonic()
+            status = 200
+            try:
+                body = run_job(job)
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            except Exception as e:
+                logger.exception("OCR job failed")
+                status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+
+            with self._lock:
+                self._counts["active"] -= 1
+                self._counts["completed" if status == 200 else "failed"] += 1
+                self._busy_seconds += time.monotonic() - start
+
+        return status, body
+
+    def metrics(self) -> dict[str, typing.Any]:
+        """Returns the metrics of the server."""
+        with self._lock:
+            return {
+                **self._counts,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "busy_seconds": self._busy_seconds,
+                "uptime_seconds": time.monotonic() - self._started,
+            }
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+
+import pytest
+
+from ocred.cli import main
+from ocred.ingest import Ingestor, read_records
+
+path_scanned = "images/Page.png"
+
+
+def read_shards(output_directory):
+    records = []
+    for name in sorted(os.listdir(output_directory)):
+        if name.startswith("shard-"):
+            with open(os.path.join(output_directory, name), encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f)
+    return records
+
+
+def test_errors(tmp_path):
+    with pytest.raises(ValueError):
+        Ingestor(str(tmp_path), str(tmp_path / "out"), output_format="csv")
+    with pytest.raises(ValueError):
+        Ingestor(str(tmp_path), str(tmp_path / "out"), checkpoint_every=0)
+
+
+def test_failed_images_are_retried(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "broken.png").write_bytes(b"not an image")
+    (images / "notes.txt").write_text("not an image either")
+    out = tmp_path / "out"
+
+    ingestor = Ingestor(str(images), str(out))
+    assert ingestor.files() == ["broken.png"]
+
+    summary = ingestor.run()
+
+    assert summary == {"processed": 0, "skipped": 0, "failed": 1}
+    with open(out / "manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["files"]["broken.png"]["status"] == "failed"
+    assert manifest["shards"] == 0
+
+    # failed images are not skipped when resuming
+    assert Ingestor(str(images), str(out)).run()["failed"] == 1
+    assert main(["ingest", str(images), str(out)]) == 1
+
+
+def test_deleted_images_are_skipped(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    images.mkdir()
+    out = tmp_path / "out"
+
+    # an image deleted after the directory was walked
+    monkeypatch.setattr(Ingestor, "files", lambda self: ["deleted.png"])
+    summary = Ingestor(str(images), str(out)).run()
+
+    assert summary == {"processed": 0, "skipped": 1, "failed": 0}
+    assert list(read_records(str(out))) == []
+    with open(out / "manifest.json", encoding="utf-8") as f:
+        assert json.load(f)["files"] == {}
+
+
+def test_ingest_and_resume(tmp_path):
+    images = tmp_path / "images"
+    (images / "nested").mkdir(parents=True)
+    shutil.copy(path_scanned, images / "one.png")
+    shutil.copy(path_scanned, images / "nested" / "two.png")
+    out = tmp_path / "out"
+
+    summary = Ingestor(str(images), str(out), checkpoint_every=1).run()
+
+    assert summary == {"processed": 2, "skipped": 0, "failed": 0}
+    records = read_shards(out)
+    assert [record["path"] for record in records] == [
+        os.path.join("nested", "two.png"),
+        "one.png",
+    ]
+    assert all(isinstance(record["text"], str) for record in records)
+    assert os.path.exists(out / "shard-00000.jsonl")
+    assert os.path.exists(out / "shard-00001.jsonl")
+
+    # unchanged images are skipped, touched images are compared by their contents
+    os.utime(images / "one.png")
+    summary = Ingestor(str(images), str(out)).run()
+    assert summary == {"processed": 0, "skipped": 2, "failed": 0}
+
+    # modified images are OCRed again
+    shutil.copy("images/CosmosOne.jpg", images / "one.png")
+    summary = Ingestor(str(images), str(out)).run()
+    assert summary == {"processed": 1, "skipped": 1, "failed": 0}
+
+    # the outdated record stays in its shard, but is not read
+    assert len(read_shards(out)) == 3
+    current = list(read_records(str(out)))
+    assert sorted(record["path"] for record in current) == [
+        os.path.join("nested", "two.png"),
+        "one.png",
+    ]
+    with open(out / "manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    [one] = [record for record in current if record["path"] == "one.png"]
+    assert one["sha256"] == manifest["files"]["one.png"]["sha256"]
+    assert manifest["files"]["one.png"]["shard"] == "shard-00002.jsonl"
+
+    # deleted images are dropped from the manifest, and their records are not read
+    os.remove(images / "one.png")
+    summary = Ingestor(str(images), str(out)).run()
+    assert summary == {"processed": 0, "skipped": 1, "failed": 0}
+    with open(out / "manifest.json", encoding="utf-8") as f:
+        assert list(json.load(f)["files"]) == [os.path.join("nested", "two.png")]
+    assert [record["path"] for record in read_records(str(out))] == [
+        os.path.join("nested", "two.png")
+    ]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from ocred.cli import main
+from ocred.loadtest import (
+    _PeakRSS,
+    character_error_rate,
+    run_load_test,
+    synthesize_page,
+    synthesize_receipt,
+    word_error_rate,
+)
+
+
+def test_synthesize():
+    img, text = synthesize_page(n_words=30, seed=1)
+    assert isinstance(img, np.ndarray)
+    assert img.dtype == np.uint8
+    assert img.shape[1] == 1240
+    assert len(text.split()) == 30
+
+    same_img, same_text = synthesize_page(n_words=30, seed=1)
+    assert same_text == text
+    assert (same_img == img).all()
+
+    small, _ = synthesize_page(n_words=30, scale=0.5, seed=1)
+    assert small.shape[1] == 620
+
+    skewed, _ = synthesize_page(n_words=30, skew=5, noise=20, seed=1)
+    assert skewed.shape[0] > img.shape[0]
+    assert skewed.shape[1] > img.shape[1]
+
+    img, text, fields = synthesize_receipt(n_items=4, seed=2)
+    assert img.shape[1] == 600
+    assert f"Order No {fields['order_number']}" in text
+    assert f"Phone {fields['phone_number']}" in text
+    assert f"Date {fields['date']}" in text
+    assert text.startswith(fields["place"])
+    assert text.endswith(f"Total Rs {fields['price']:.2f}")
+
+
+def test_error_rates():
+    assert character_error_rate("hello world", "hello world") == 0
+    assert character_error_rate("hello world", "hello  world\n") == 0
+    assert character_error_rate("abcd", "abed") == 0.25
+    assert character_error_rate("abcd", "") == 1
+
+    assert word_error_rate("the old book", "the old book") == 0
+    assert word_error_rate("the old book", "the book") == pytest.approx(1 / 3)
+    assert word_error_rate("the old book", "a new old book") == pytest.approx(2 / 3)
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        run_load_test("unknown")
+    with pytest.raises(ValueError):
+        run_load_test("meaningful", kind="poster")
+    with pytest.raises(ValueError):
+        run_load_test("invoice", kind="page")
+
+    # only easyocr runs on the CPU or unquantized
+    assert main(["loadtest", "--mode", "meaningful", "--cpu"]) == 2
+
+
+def test_peak_rss_is_measured_per_run():
+    with _PeakRSS(interval=0.01) as small:
+        time.sleep(0.05)
+    # the memory allocated for a run is not reported by the following runs
+    with _PeakRSS(interval=0.01) as large:
+        memory = np.ones(256 * 1024**2 // 8)
+        time.sleep(0.05)
+    del memory
+    with _PeakRSS(interval=0.01) as after:
+        time.sleep(0.05)
+
+    # the memory of child processes (Tesseract) is included
+    with _PeakRSS(interval=0.01, scan_interval=0.01) as tree:
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import time; b = b'x' * 256 * 1024**2; time.sleep(0.5)",
+            ],
+            check=True,
+        )
+
+    assert small.peak_mb > 0
+    assert tree.peak_mb > small.peak_mb + 200
+    assert large.peak_mb > small.peak_mb + 200
+    assert after.peak_mb < large.peak_mb - 200
+
+
+def test_load_test(capsys):
+    report = run_load_test("meaningful", n_documents=2, concurrency=2, skew=1, noise=5)
+
+    assert report["errors"] == []
+    assert report["n_documents"] == 2
+    assert report["concurrency"] == 2
+    assert report["throughput"] > 0
+    assert 0 < report["latency"]["p50"] <= report["latency"]["p99"]
+    assert report["peak_rss_mb"] > 0
+    assert report["cer"] >= 0
+    assert report["wer"] >= 0
+    assert report["fields"] is None
+
+    status = main(
+        ["loadtest", "--mode", "invoice", "--kind", "receipt", "--documents", "1"]
+        + ["--concurrency", "1", "2", "--json"]
+    )
+    reports = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert status == 0
+    assert [report["concurrency"] for report in reports] == [1, 2]
+    assert all(report["mode"] == "invoice" for report in reports)
+    for report in reports:
+        assert report["cer"] is None
+        assert set(report["fields"]) == {
+            "place",
+            "date",
+            "phone_number",
+            "order_number",
+            "price",
+        }
@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import os
 
+import cv2
+import numpy as np
 import pytest
 
+import ocred.ocr
+from ocred.loadtest import character_error_rate
 from ocred.ocr import OCR
 
 path_scanned = "images/Page.png"
@@ -34,6 +38,13 @@ def test_deprecations_and_errors():
     with pytest.raises(ValueError):
         ocr.process_extracted_text_from_invoice()
 
+    ocr = OCR(
+        False,
+        path_scanned,
+    )
+    with pytest.raises(ValueError):
+        ocr.draw_boxes()
+
 
 def test_ocr_with_scanned_image():
     ocr = OCR(
@@ -49,6 +60,15 @@ def test_ocr_with_scanned_image():
     assert isinstance(ocr.text, str)
     assert isinstance(text, str)
     assert text == ocr.text
+    assert not os.path.exists("OCR.png")
+
+    img = ocr.draw_boxes(color_by_confidence=True)
+    assert isinstance(img, np.ndarray)
+    assert img.shape == cv2.imread(path_scanned).shape
+    assert (img != cv2.imread(path_scanned)).any()
+    assert ocr.draw_boxes(png=True).startswith(b"\x89PNG")
+
+    ocr.draw_boxes("OCR.png")
     assert os.path.exists("OCR.png")
     assert os.path.exists("output.txt")
     assert not os.path.exists("preprocessed.png")
@@ -63,19 +83,53 @@ def test_ocr_with_real_image():
         path_real,
     )
 
-    assert ocr.path == "preprocessed.png"
+    assert ocr.path == path_real
     assert ocr.preprocess is True
+    assert ocr.image.ndim == 3
+    assert not os.path.exists("preprocessed.png")
 
     text = ocr.ocr_meaningful_text(preserve_orientation=True)
 
     assert isinstance(ocr.text, str)
     assert isinstance(text, str)
     assert text == ocr.text
+    ocr.draw_boxes("OCR.png")
+    assert os.path.exists("OCR.png")
+    assert not os.path.exists("preprocessed.png")
+
+    os.remove("OCR.png")
+
+
+def test_ocr_cascaded_text():
+    ocr = OCR(
+        False,
+        path_scanned,
+    )
+
+    text, words = ocr.ocr_cascaded_text(save_output=True)
+
+    assert isinstance(ocr.text, str)
+    assert isinstance(text, str)
+    assert text == ocr.text
+    assert isinstance(ocr.words, list)
+    assert words == ocr.words
+    assert len(words) > 0
+    for word in words:
+        assert set(word) == {"text", "confidence", "box", "engine"}
+        assert word["engine"] in ("tesseract", "easyocr")
+        assert 0 <= word["confidence"] <= 1
+        assert len(word["box"]) == 4
+    assert text == " ".join(word["text"] for word in words)
+    ocr.draw_boxes("OCR.png")
     assert os.path.exists("OCR.png")
-    assert os.path.exists("preprocessed.png")
+    assert os.path.exists("output.txt")
+
+    # every word is accepted from Tesseract with no threshold
+    _, words = ocr.ocr_cascaded_text(min_confidence=0)
+    assert all(word["engine"] == "tesseract" for word in words)
 
     os.remove("OCR.png")
-    os.remove("preprocessed.png")
+    os.remove("output.txt")
 
 
 def test_ocr_sign_board():
@@ -95,6 +149,7 @@ def test_ocr_sign_board():
     assert isinstance(detailed_text, list)
     assert detailed_text == ocr.detailed_text
     assert text == ocr.text
+    ocr.draw_boxes("OCR.png")
     assert os.path.exists("OCR.png")
     assert os.path.exists("output.txt")
     assert not os.path.exists("preprocessed.png")
@@ -103,6 +158,38 @@ def test_ocr_sign_board():
     os.remove("output.txt")
 
 
+@pytest.fixture()
+def torch_threads():
+    import torch
+
+    threads = torch.get_num_threads()
+    yield 2
+    torch.set_num_threads(threads)
+
+
+def test_ocr_sparse_text_on_cpu(torch_threads):
+    languages = ("en", "hi")
+    float_reader = ocred.ocr._get_reader(languages, gpu=False, quantize=False)
+    quantized_reader = ocred.ocr._get_reader(languages, gpu=False, quantize=True)
+    assert float_reader is not quantized_reader
+    assert ocred.ocr._batch_size(quantized_reader, 100) == 1
+
+    for path in (path_sign_board, path_invoice):
+        # fresh objects, so that no detection is shared between the two runs
+        text, _ = OCR(False, path).ocr_sparse_text(
+            gpu=False, quantize=False, threads=torch_threads
+        )
+        quantized_text, _ = OCR(False, path).ocr_sparse_text(
+            gpu=False, quantize=True, threads=torch_threads
+        )
+
+        # int8 quantized models should read (almost) the same words as float32
+        # models (see `ocred loadtest --cpu` for their speed)
+        quantized_words, words = set(quantized_text.split()), set(text.split())
+        assert len(quantized_words & words) >= 0.8 * len(words)
+        assert character_error_rate(text, quantized_text) <= 0.2
+
+
 def test_ocr_invoices():
     global path_invoice
     ocr = OCR(
@@ -121,6 +208,7 @@ def test_ocr_invoices():
     assert isinstance(detailed_text, list)
     assert detailed_text == ocr.detailed_text
     assert text == ocr.text
+    ocr.draw_boxes("OCR.png")
     assert os.path.exists("OCR.png")
     assert not os.path.exists("preprocessed.png")
 
@@ -160,6 +248,7 @@ def test_ocr_invoices():
     assert isinstance(ocr.text, str)
     assert isinstance(text, str)
     assert text == ocr.text
+    ocr.draw_boxes("OCR.png")
     assert os.path.exists("OCR.png")
     assert not os.path.exists("preprocessed.png")
 
@@ -186,3 +275,76 @@ def test_ocr_invoices():
     assert isinstance(extracted_info["post_processed_word_list"], list)
 
     os.remove("OCR.png")
+
+
+def test_ocr_invoice_regions(monkeypatch):
+    recognized_boxes = []
+    recognize_boxes = ocred.ocr._recognize_boxes
+
+    def counting_recognize_boxes(reader, img_grey, boxes, **kwargs):
+        recognized_boxes.extend(boxes)
+        return recognize_boxes(reader, img_grey, boxes, **kwargs)
+
+    monkeypatch.setattr(ocred.ocr, "_recognize_boxes", counting_recognize_boxes)
+
+    ocr = OCR(
+        False,
+        "images/1146-receipt.jpg",
+    )
+
+    text, detailed_text = ocr.ocr_invoice(save_output=True)
+
+    assert isinstance(ocr.text, str)
+    assert isinstance(text, str)
+    assert isinstance(ocr.detailed_text, list)
+    assert isinstance(detailed_text, list)
+    assert detailed_text == ocr.detailed_text
+    assert text == ocr.text
+    ocr.draw_boxes("OCR.png")
+    assert os.path.exists("OCR.png")
+    assert os.path.exists("output.txt")
+
+    horizontal_list, free_list = ocr._easyocr_detection(
+        ocred.ocr._get_reader(("en", "hi"))
+    )
+    assert len(recognized_boxes) < len(horizontal_list) + len(free_list)
+
+    # only a part of the invoice is recognized; the item lines are skipped
+    _, full_detailed_text = OCR(False, "images/1146-receipt.jpg").ocr_sparse_text()
+    assert len(detailed_text) < len(full_detailed_text)
+    assert "10.00" not in text
+
+    extracted_info = ocr.process_extracted_text_from_invoice()
+
+    assert isinstance(extracted_info, dict)
+    assert (
+        "price" in extracted_info
+        and "date" in extracted_info
+        and "place" in extracted_info
+        and "order_number" in extracted_info
+        and "phone_number" in extracted_info
+        and "post_processed_word_list" in extracted_info
+    ) is True
+    assert isinstance(extracted_info["place"], str)
+
+    os.remove("OCR.png")
+    os.remove("output.txt")
+
+
+def test_shared_artifacts():
+    ocr = OCR(
+        False,
+        path_invoice,
+    )
+
+    # the image is decoded once and shared by every method
+    assert ocr.image is ocr.image
+    assert (ocr.image == cv2.imread(path_invoice)).all()
+    assert ocr.grayscale.shape == ocr.image.shape[:2]
+
+    ocr.ocr_sparse_text()
+    reader = ocred.ocr._get_reader(("en", "hi"))
+    detection = ocr._easyocr_detection(reader)
+
+    ocr.ocr_invoice()
+    assert ocr._easyocr_detection(reader) is detection
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import shlex
+import sys
+
+import pytest
+
+import ocred.profiles
+from ocred.ocr import OCR
+from ocred.profiles import Profile, get_profile, list_profiles, register_profile
+
+path_scanned = "images/Page.png"
+
+
+def test_profile():
+    profile = Profile(
+        "digits",
+        tesseract_languages=("eng", "hin"),
+        psm=7,
+        whitelist="0123456789",
+        dpi=300,
+    )
+
+    assert profile.tesseract_config == (
+        "-l eng+hin --oem 1 --psm 7 --dpi 300 -c tessedit_char_whitelist=0123456789"
+    )
+    assert profile.easyocr_languages == ("en",)
+
+    with pytest.raises(ValueError):
+        Profile("no-languages", tesseract_languages=())
+    with pytest.raises(ValueError):
+        Profile("bad-oem", oem=4)
+    with pytest.raises(ValueError):
+        Profile("bad-psm", psm=14)
+    with pytest.raises(ValueError):
+        Profile("bad-dpi", dpi=0)
+
+    # lists are stored as (hashable) tuples
+    profile = Profile("lists", tesseract_languages=["eng"], easyocr_languages=["en"])
+    assert profile.tesseract_languages == ("eng",)
+    assert profile.easyocr_languages == ("en",)
+    assert hash(profile)
+
+    # whitelists with spaces stay a single argument
+    profile = Profile("spaces", whitelist="0123 .")
+    assert shlex.split(profile.tesseract_config)[-1] == (
+        "tessedit_char_whitelist=0123 ."
+    )
+
+
+def test_whitelist_on_windows(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "win32")
+
+    # pytesseract splits the configuration without unquoting it on Windows
+    profile = Profile("symbols", whitelist="0123$.'")
+    assert shlex.split(profile.tesseract_config, posix=False)[-1] == (
+        "tessedit_char_whitelist=0123$.'"
+    )
+    with pytest.raises(ValueError):
+        Profile("spaces", whitelist="0123 .")
+
+
+def test_registry(monkeypatch):
+    # registering profiles only for this test
+    monkeypatch.setattr(ocred.profiles, "_profiles", dict(ocred.profiles._profiles))
+
+    assert {"book-en", "receipt-en-hi", "signboard"} <= set(list_profiles())
+    assert get_profile("receipt-en-hi").psm == 6
+    assert get_profile("signboard").psm == 11
+
+    profile = Profile("custom", psm=4)
+    assert get_profile(profile) is profile
+
+    register_profile(profile)
+    assert get_profile("custom") is profile
+    assert "custom" in list_profiles()
+
+    with pytest.raises(ValueError):
+        get_profile("unknown")
+
+
+def test_ocr_with_profile():
+    get_profile("book-en").warm()
+
+    ocr = OCR(
+        False,
+        path_scanned,
+    )
+
+    text = ocr.ocr_meaningful_text(profile="book-en")
+
+    assert isinstance(text, str)
+    assert text == ocr.text
+    assert text == ocr.ocr_meaningful_text(
+        tesseract_config=get_profile("book-en").tesseract_config
+    )
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import cv2
+import pytest
+
+from ocred.ocr import OCR
+from ocred.profiles import get_profile
+from ocred.scripts import detect_script, profile_for_script
+
+path_scanned = "images/Page.png"
+
+
+def test_profile_for_script():
+    profile = profile_for_script("Latin")
+    assert profile.name == "auto-latin"
+    assert profile.tesseract_languages == ("eng",)
+    assert profile.easyocr_languages == ("en",)
+
+    profile = profile_for_script("Devanagari", base=get_profile("receipt-en-hi"))
+    assert profile.name == "receipt-en-hi-devanagari"
+    assert profile.tesseract_languages == ("hin", "eng")
+    assert profile.easyocr_languages == ("hi", "en")
+    assert profile.psm == get_profile("receipt-en-hi").psm
+
+    with pytest.raises(ValueError):
+        profile_for_script("Klingon")
+
+
+def test_detect_script():
+    script, confidence = detect_script(cv2.imread(path_scanned))
+
+    assert script == "Latin"
+    assert isinstance(confidence, float)
+
+    ocr = OCR(
+        False,
+        path_scanned,
+    )
+
+    text = ocr.ocr_meaningful_text(profile="auto")
+
+    assert isinstance(text, str)
+    assert ocr.script["script"] == "Latin"
+    assert isinstance(ocr.script["confidence"], float)
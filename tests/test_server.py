@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+import ocred.server
+from ocred.cli import main
+from ocred.client import Client
+from ocred.server import Server, run_job
+
+path_scanned = "images/Page.png"
+path_real = "images/CosmosOne.jpg"
+path_invoice = "images/1146-receipt.jpg"
+
+
+@pytest.fixture()
+def server():
+    server = Server(("127.0.0.1", 0), max_concurrency=2, max_queue=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_health_and_metrics(server):
+    client = Client(*server.server_address[:2])
+
+    assert client.health() == {"status": "ok"}
+
+    metrics = client.metrics()
+    assert metrics["completed"] == 0
+    assert metrics["failed"] == 0
+    assert metrics["queued"] == 0
+    assert metrics["active"] == 0
+    assert metrics["max_concurrency"] == 2
+    assert metrics["max_queue"] == 4
+
+
+def test_errors(server):
+    client = Client(*server.server_address[:2])
+
+    with pytest.raises(ValueError):
+        client.ocr("does/not/exist.png")
+    with pytest.raises(ValueError):
+        client.ocr(path_scanned, mode="unknown")
+    with pytest.raises(RuntimeError):
+        client._request("/unknown")
+
+    with pytest.raises(ValueError):
+        client.ocr(path_scanned, unknown_option=True)
+    with pytest.raises(ValueError, match="save_output"):
+        client.ocr(path_scanned, save_output=True)
+    with pytest.raises(ValueError, match="threads"):
+        client.ocr(path_scanned, mode="sparse", threads=2)
+
+    assert client.metrics()["failed"] == 5
+
+    with pytest.raises(ValueError):
+        Server(("127.0.0.1", 0), max_concurrency=0)
+
+
+def test_non_loopback_warning(caplog):
+    server = Server(("127.0.0.1", 0))
+    server.server_close()
+    assert "not a loopback address" not in caplog.text
+
+    server = Server(("0.0.0.0", 0))
+    server.server_close()
+    assert "not a loopback address" in caplog.text
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 10
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_concurrency_and_queue(monkeypatch):
+    release = threading.Event()
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def slow_job(job):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        release.wait(10)
+        with lock:
+            running["now"] -= 1
+        return {"text": job["path"], "details": None}
+
+    monkeypatch.setattr(ocred.server, "run_job", slow_job)
+
+    server = Server(("127.0.0.1", 0), max_concurrency=2, max_queue=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = Client(*server.server_address[:2])
+
+    results = []
+    jobs = [
+        threading.Thread(target=lambda: results.append(server.submit({"path": "a"})))
+        for _ in range(3)
+    ]
+    try:
+        # two jobs run, and the third one waits for a free slot
+        for job in jobs[:2]:
+            job.start()
+        _wait_for(lambda: server.metrics()["active"] == 2)
+        jobs[2].start()
+        _wait_for(lambda: server.metrics()["queued"] == 1)
+
+        # the queue is full
+        with pytest.raises(RuntimeError, match="503"):
+            client.ocr(path_scanned)
+        assert server.metrics()["rejected"] == 1
+    finally:
+        release.set()
+        for job in jobs:
+            job.join()
+        server.shutdown()
+        server.server_close()
+
+    assert running["max"] == 2
+    assert [status for status, _ in results] == [200, 200, 200]
+    assert server.metrics()["completed"] == 3
+
+
+def test_concurrent_preprocessing(server):
+    client = Client(*server.server_address[:2])
+    expected = {
+        path: run_job({"path": path, "preprocess": True})["text"]
+        for path in (path_real, path_invoice)
+    }
+
+    results = {}
+
+    def ocr(path):
+        results[path] = client.ocr(path, preprocess=True)["text"]
+
+    threads = [threading.Thread(target=ocr, args=(path,)) for path in expected]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == expected
+
+
+def test_ocr(server, capsys):
+    host, port = server.server_address[:2]
+    client = Client(host, port)
+
+    result = client.ocr(path_scanned)
+
+    assert isinstance(result["text"], str)
+    assert result["details"] is None
+    assert client.metrics()["completed"] == 1
+
+    status = main(
+        ["ocr", path_scanned, path_scanned, "--host", host, "--port", str(port)]
+        + ["--json", "--jobs", "2"]
+    )
+    lines = capsys.readouterr().out.splitlines()
+
+    assert status == 0
+    assert len(lines) == 2
+    assert json.loads(lines[0])["text"] == result["text"]
+    assert client.metrics()["completed"] == 3
+
+
+def test_cli_errors(server, capsys):
+    host, port = server.server_address[:2]
+
+    status = main(["ocr", "does/not/exist.png", "--host", host, "--port", str(port)])
+
+    assert status == 1
+    assert "does/not/exist.png" in capsys.readouterr().err